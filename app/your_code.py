@@ -11,23 +11,412 @@ import requests
 import json
 import time
 import os
-import re
 import threading
+import queue
+import sqlite3
+import traceback
+import functools
+import random
+import hashlib
 from typing import Optional, Dict, List
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter, OrderedDict, deque
+from itertools import islice
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from requests.adapters import HTTPAdapter
 import urllib3
+from urllib3.util.retry import Retry
+
+try:
+    import orjson  # 可选加速：桌面环境安装后自动启用
+except ImportError:  # Android 打包环境没有 orjson，回退到标准库
+    orjson = None
 
 # 禁用SSL警告
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
-# ---------- 通用正则 ----------
-INVALID_CHARS = re.compile(r'[<>:\"/|?*]')
+# ---------- 调试开关：设置环境变量 BDSM_DEBUG=1 时打印异常堆栈 ----------
+DEBUG = os.environ.get("BDSM_DEBUG") == "1"
+
+# ---------- 文件名非法字符替换表 ----------
+# 反斜杠在 Windows 上是路径分隔符；空字符会让 open() 直接抛出 ValueError
+INVALID_CHARS_TABLE = str.maketrans({c: "_" for c in '<>:"/\\|?*\x00'})
 
 # ---------- 登录状态文件 ----------
 LOGIN_STATE_FILE = "login_state.json"
+TOKEN_CACHE_FILE = "token_cache.json"  # 最近验证有效的 Token（sha256 -> 验证时间），跨次启动复用
+TOKEN_DISK_CACHE_TTL = 300  # 上次验证有效后多少秒内再次启动不重新验证
+
+# ---------- 性别/性取向/角色代码映射 ----------
+SEX_TEXT_MAP = {1: "男", 2: "女", 3: "伪娘", 4: "跨性别男性", 5: "跨性别女性"}
+SEX_O_TEXT_MAP = {1: "双重", 2: "异性恋", 3: "男同", 4: "女同", 0: ""}
+SEX_P_TEXT_MAP = {1: "Dom", 2: "Sub", 3: "S", 4: "M", 5: "Switch", 0: ""}
+
+# ---------- 字段有效性判断 ----------
+UNKNOWN_TEXT = "未知"
+PLACEHOLDER_NAME_PREFIX = "用户_"
+
+def _is_known(value):
+    """字段有值且不是“未知”"""
+    return bool(value) and value != UNKNOWN_TEXT
+
+def _is_real_text(value):
+    """接口文本有效：有值、不是“未知”，也不是“用户_xxx”这类占位名"""
+    return _is_known(value) and value[:len(PLACEHOLDER_NAME_PREFIX)] != PLACEHOLDER_NAME_PREFIX
+
+# ---------- 时间格式化 ----------
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def _now_str():
+    """当前时间的“年-月-日 时:分:秒”字符串（isoformat 比 strftime 解析格式串更快，结果相同）"""
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+@functools.lru_cache(maxsize=4096)
+def _fmt_ts_cached(ts):
+    return time.strftime(TIME_FORMAT, time.localtime(ts))
+
+def _fmt_ts(ts):
+    """时间戳转“年-月-日 时:分:秒”，同一时间戳只格式化一次；None 与 time.localtime 一致取当前时间"""
+    if ts is None:
+        return _now_str()
+    return _fmt_ts_cached(ts)
+
+# ---------- 用户帖子文件 ----------
+POST_MARKER = "【帖子 #"  # 每个帖子条目的开头，统计文件内帖子数用
+POST_MARKER_BYTES = POST_MARKER.encode("utf-8")
+FILE_SCAN_CHUNK = 1 << 16  # 按块扫描文件的块大小（须不小于 marker 长度）
+
+def _count_marker_in_file(path, marker=POST_MARKER_BYTES):
+    """按块读取文件统计 marker 出现次数（bytes.count，不解码、不整体读入内存）"""
+    count = 0
+    tail = b""
+    keep = len(marker) - 1
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(FILE_SCAN_CHUNK), b""):
+            count += chunk.count(marker)
+            # 跨块的 marker 只可能落在“上一块末尾 + 本块开头”这一小段里，单独统计，避免拼接整块
+            if tail:
+                count += (tail + chunk[:keep]).count(marker)
+            tail = chunk[-keep:] if keep else b""
+    return count
+
+# ---------- 帖子作者 ----------
+USER_NAME_KEYS = ("user_name", "name")
+
+def _extract_user_id(post):
+    """帖子作者ID：优先取 post["user"]["id"]（user 可能缺失或不是字典），否则取 post["user_id"]"""
+    try:
+        user_id = post["user"]["id"]
+    except (KeyError, TypeError, IndexError):
+        user_id = None
+    return user_id or post.get("user_id")
+
+def _user_display_name(user, user_id):
+    """依次取 user_name、name，都为空时用“用户_ID”"""
+    for key in USER_NAME_KEYS:
+        name = user.get(key)
+        if name:
+            return name
+    return f"{PLACEHOLDER_NAME_PREFIX}{user_id}"
+
+# ---------- JSON 编解码 ----------
+def _json_loads(raw):
+    """解析JSON（支持 bytes/str），优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps(obj, indent=False):
+    """序列化为JSON字符串（中文不转义，非缩进时为紧凑格式），优先使用 orjson"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0).decode("utf-8")
+        except TypeError:
+            pass  # 非字符串键、超大整数等 orjson 不支持的情况交给标准库
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+def _json_dumps_bytes(obj, indent=False):
+    """同 _json_dumps，但直接返回 UTF-8 bytes（orjson 的输出无需先解码再编码），用于二进制写文件"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+        except TypeError:
+            pass
+    return _json_dumps(obj, indent).encode("utf-8")
+
+# ---------- 原子写文件 ----------
+def _atomic_write_bytes(path, data):
+    """先写同目录临时文件并 fsync，再 os.replace 替换，写到一半崩溃也不会留下损坏的文件"""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb", buffering=1 << 16) as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# ---------- 帖子列表请求体（只读常量） ----------
+POSTS_PAYLOAD_TEMPLATE = {
+    "page": 1,
+    "order": {"create_time": "desc"},  # 按创建时间倒序（由新到旧）
+    "append": {
+        "1": "files",
+        "3": "is_dig",
+        "6": "play.u",
+        "7": "play_digs",
+        "8": "gt_info",
+        "user": ["sex_text", "sex_p_text", "sex_o_text"]
+    },
+    "with_count": ["comments", "favos", "digs"],
+    "kw": "",
+}
+# 列表请求体只有 page 会变化：模块加载时预先序列化其余部分，请求时只拼接页码
+_POSTS_BODY_TAIL = _json_dumps_bytes(
+    {k: v for k, v in POSTS_PAYLOAD_TEMPLATE.items() if k != "page"}
+)[1:]
+
+# ---------- 注释JSON字段顺序 ----------
+ATTENTION_ONLY_FIELDS = frozenset(("_query_info", "_note", "api_response"))  # 出现任一字段即视为关注数据
+ATTENTION_FIELD_PRIORITY = {f: i for i, f in enumerate(
+    ["_query_info", "_note", "api_response", "id", "create_time", "user_id"])}
+POST_FIELD_PRIORITY = {f: i for i, f in enumerate(["id", "create_time", "user_id", "title", "content"])}
+
+COMMENT_CACHEABLE_FIELDS = frozenset(("api_response",))  # 跨次保存内容不变、可复用渲染结果的顶层字段
+COMMENT_BLOCK_CACHE_SIZE = 1024  # 最多缓存多少个用户的渲染结果
+
+# ---------- 注释JSON缩进（预先生成，避免每个字段重复拼接） ----------
+JSON_INDENTS = tuple("  " * level for level in range(17))
+
+# ---------- 连接池 ----------
+# 用户名搜索最多 200 个翻页线程 + 200 个用户信息线程同时请求，批量投票最多 500 线程，
+# 连接池要能容纳全部并发连接，否则多出的连接用完即被丢弃，下次又要重新握手
+HTTP_POOL_SIZE = 500
+# 只重试建立连接失败（请求尚未发出），POST 投票不会因重试被重复提交
+HTTP_CONNECT_RETRIES = 2
+HTTP_RETRY_BACKOFF = 0.2
+# 帖子列表/投票接口遇到网络异常、429 或 5xx 时整体重试（指数退避）；重复投票会被服务端判为“已投”
+HTTP_RETRY_TRIES = 3
+HTTP_RETRY_BASE_DELAY = 0.3
+HTTP_RETRY_AFTER_MAX = 10  # 429 响应的 Retry-After 最多等待的秒数
+
+# ---------- 请求限速 ----------
+POSTS_RATE_LIMIT = 20  # 帖子列表接口每秒最多请求次数
+SAVE_RATE_LIMIT = 20  # 搜索结果逐帖保存（可能需要查询作者信息）每秒最多次数
+SAVE_POST_THREADS = 4  # 搜索结果按作者分组并行保存的线程数
+ATTENTION_RATE_LIMIT = 10  # 关注列表接口每秒最多请求次数（多页并发获取时生效）
+ATTENTION_WRITER_THREADS = 2  # 关注数据后台写文件的线程数
+# 整个站点（所有接口、所有功能共用）每秒最多请求次数，连续执行多个功能时避免触发 429；设为 None 不限制
+HOST_RATE_LIMIT = 100
+
+class RateLimiter:
+    """令牌桶限速器：平均每秒 rate 次，最多允许 burst 次突发（线程安全）"""
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst if burst is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """取一个令牌，令牌不足时阻塞到可用为止"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class RateLimitedSession(requests.Session):
+    """每个请求发出前先从限速器取令牌的会话（limiter 为 None 时不限速）"""
+    def __init__(self, limiter=None):
+        super().__init__()
+        self.limiter = limiter
+    
+    def request(self, *args, **kwargs):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return super().request(*args, **kwargs)
+
+# ---------- 批量投票 ----------
+BATCH_VOTE_ID_LIST_LIMIT = 1000  # 结束时最多列出的成功/已投ID数，完整记录在结果文件中
+BATCH_VOTE_INFLIGHT_FACTOR = 2  # 最多提交 线程数×此倍数 个未完成任务，ID 范围很大时不会一次创建全部 future
+
+# ---------- 字段注释映射（只读常量，模块加载时构建一次） ----------
+FIELD_COMMENTS = {
+    # 基本字段
+    "id": "ID",
+    "code": "响应代码",
+    "msg": "响应消息",
+    "data": "数据主体",
+    
+    # 分页信息
+    "total": "总记录数",
+    "per_page": "每页数量",
+    "current_page": "当前页码",
+    "last_page": "总页数",
+    
+    # 关注相关
+    "uid": "被关注者用户ID",
+    "attention_id": "关注记录ID",
+    "create_time": "创建时间",
+    "update_time": "更新时间",
+    "user_id": "用户ID",
+    
+    # 帖子相关
+    "status": "状态",
+    "title": "标题",
+    "pic": "头像",
+    "onclick": "浏览量",
+    "play_id": "播放ID",
+    "time_add": "额外时间",
+    "time_end": "结束时间",
+    "gongt_id": "公告ID",
+    "myorder": "排序值",
+    "sex": "性别代码",
+    "rank_time": "排名时间",
+    "nums": "数量",
+    "com_count": "评论数",
+    "dig_count": "点赞数",
+    "rank": "排名",
+    "com_my": "我的评论",
+    "rank_admin": "管理员排名",
+    "counts": "计数",
+    "qr_id": "二维码ID",
+    "video": "视频",
+    "video_poster": "视频封面",
+    "day_rank": "日排名",
+    "create_time1": "创建时间1",
+    "banner": "横幅",
+    "game_id": "游戏ID",
+    "is_zl": "是否置顶",
+    "title_zl": "置顶标题",
+    "tags": "标签",
+    "reason": "原因",
+    "os_id": "操作系统ID",
+    "os_cate": "操作系统分类",
+    "favo_count": "收藏数",
+    "goods_id": "商品ID",
+    "icon_tag": "图标标签",
+    "ip": "IP地址",
+    "is_black": "是否黑名单",
+    "is_wd": "是否违规",
+    "pump_qr_id": "泵二维码ID",
+    "dig_down": "点踩数",
+    "is_hot": "是否热门",
+    "rank_good_bad": "好评差评",
+    "rank_b": "B排名",
+    "count_gz": "关注数",
+    "file_del_num": "删除文件数",
+    "rank_res": "资源排名",
+    "rank_day_hour_time": "日小时排名时间",
+    "rank_day_hour": "日小时排名",
+    "sex_o": "性取向代码",
+    "ext_field": "扩展字段",
+    "files": "图片列表",
+    "is_dig": "是否已点赞",
+    "play": "播放内容",
+    "play_digs": "播放点赞",
+    "gt_info": "其他信息",
+    
+    # 用户信息
+    "user": "用户信息",
+    "user_name": "用户名",
+    "is_admin": "是否管理员",
+    "rz_sex": "认证性别",
+    "tag": "标签",
+    "icons": "图标",
+    "birthday": "生日",
+    "age": "年龄",
+    "country_pic": "国旗图片",
+    "sex_p": "角色代码",
+    "jg_num": "警告次数",
+    "pic_border": "头像边框",
+    "sex_text": "性别",
+    "sex_p_text": "角色",
+    "sex_o_text": "性取向",
+    "nick_name": "昵称",
+    "intro": "个人简介",
+    "country": "地区",
+    "height": "身高",
+    "weight": "体重",
+    "last_time": "最后在线时间",
+    "update_time": "更新时间",
+    "money": "余额",
+    "user_group_id": "用户组ID",
+    "name": "真实姓名",
+    "leader": "是否为领导",
+    "address": "地址",
+    "fen": "积分",
+    "group_time": "入群时间",
+    "openid": "微信openid",
+    "keys": "钥匙数量",
+    "is_chat": "是否允许聊天",
+    "is_check": "是否已验证",
+    "is_delc": "是否已删除",
+    "fsr_friend": "好友数",
+    "fsr_sm": "SM相关数",
+    "fsr_circle": "圈子数",
+    "time_cold": "冷却时间",
+    "is_cold": "是否冷却中",
+    "is_has_ele": "是否有元素",
+    "ele_cold_num": "元素冷却数量",
+    "ele_cold": "元素冷却",
+    "last_ele_link": "最后元素链接时间",
+    "crank": "排名",
+    "rank_code": "等级代码",
+    "quick_dels": "快速删除设置",
+    "quick_orders": "快速排序设置",
+    "star_color": "星星颜色",
+    "rank_code1": "等级代码1",
+    "rank_code2": "等级代码2",
+    "last_line": "最后线路",
+    "friend_time": "成为好友时间",
+    "pump_rate": "泵率",
+    "is_dh": "是否为DH",
+    "is_no_circle": "是否无圈子",
+    "is_unlock": "是否解锁",
+    "is_rl": "是否为RL",
+    "sex_cert": "性别认证",
+    "zuan": "钻石数量",
+    
+    # files 数组内部字段翻译
+    "table_name": "表名",
+    "data_id": "数据ID",
+    "basename": "基础名称",
+    "extension": "扩展名",
+    "field": "字段名",
+    "filename": "文件名",
+    "size": "大小",
+    "type": "类型",
+    "url": "图片链接",
+    "ges": "其他信息",
+    "check_code": "检查代码",
+    "wavs": "音频信息",
+    
+    # 查询信息
+    "_query_info": "查询信息",
+    "_note": "注释说明",
+    "api_response": "API响应数据",
+    "query_time": "查询时间",
+    "query_timestamp": "查询时间戳",
+}
 
 # ---------- 结果保存器基类 ----------
+REPORT_RULE = "=" * 70  # 报告分隔线
+REPORT_DASH = "-" * 70  # 表头下划线
+
 class ResultSaver:
     """通用的结果保存器"""
     def __init__(self, save_dir, filename_prefix, start_info="", end_info=""):
@@ -44,57 +433,216 @@ class ResultSaver:
             self.filename = f"{filename_prefix}_{timestamp}.txt"
         
         self.filepath = os.path.join(save_dir, self.filename)
+        # 文件只打开一次并保持到 finalize/close，多线程写入由锁保证每行完整；
+        # 调用方用 with 管理生命周期，并在每页/每批结束时 flush，中途异常或进程被杀时最多丢失当前一批
+        self._lock = threading.Lock()
+        self._fh = open(self.filepath, 'w', encoding='utf-8', buffering=64 * 1024)
         self._write_header(start_info, end_info)
     
     def _write_header(self, start_info, end_info):
         """写入文件头"""
-        with open(self.filepath, 'w', encoding='utf-8') as f:
-            f.write("="*70 + "\n")
-            f.write("                   任务结果报告\n")
-            f.write("="*70 + "\n")
-            f.write(f"任务时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-            if start_info and end_info:
-                f.write(f"任务范围: {start_info} 到 {end_info}\n")
-            f.write(f"保存位置: {self.save_dir}\n")
-            f.write("="*70 + "\n\n")
-            f.write("详细任务记录:\n")
-            f.write("="*70 + "\n")
-            f.write("时间                   任务ID/名称     状态       详情\n")
-            f.write("-"*70 + "\n")
+        range_line = f"任务范围: {start_info} 到 {end_info}\n" if start_info and end_info else ""
+        self._fh.write(
+            f"{REPORT_RULE}\n"
+            "                   任务结果报告\n"
+            f"{REPORT_RULE}\n"
+            f"任务时间: {_now_str()}\n"
+            f"{range_line}"
+            f"保存位置: {self.save_dir}\n"
+            f"{REPORT_RULE}\n\n"
+            "详细任务记录:\n"
+            f"{REPORT_RULE}\n"
+            "时间                   任务ID/名称     状态       详情\n"
+            f"{REPORT_DASH}\n"
+        )
     
     def save_record(self, task_id, status, details):
         """保存单条记录"""
         try:
-            with open(self.filepath, 'a', encoding='utf-8') as f:
-                timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-                f.write(f"{timestamp}  {str(task_id):12s}   {status:8s} | {details}\n")
+            timestamp = _now_str()
+            line = f"{timestamp}  {str(task_id):12s}   {status:8s} | {details}\n"
+            with self._lock:
+                self._fh.write(line)
         except Exception as e:
             print(f"❌ 保存记录失败: {e}")
     
     def finalize(self, success, failed, total, elapsed, extra_stats=None):
         """完成文件保存"""
         try:
-            with open(self.filepath, 'a', encoding='utf-8') as f:
-                f.write("="*70 + "\n\n")
-                f.write("任务统计信息:\n")
-                f.write("="*70 + "\n")
-                f.write(f"结束时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"总任务数: {total}\n")
-                f.write(f"成功数量: {success}\n")
-                f.write(f"失败数量: {failed}\n")
-                
-                if extra_stats:
-                    for key, value in extra_stats.items():
-                        f.write(f"{key}: {value}\n")
-                
-                f.write(f"总耗时: {elapsed:.1f}秒\n")
-                if elapsed > 0:
-                    f.write(f"平均速度: {total/elapsed:.1f} 任务/秒\n")
-                f.write(f"文件位置: {self.save_dir}\n")
-                f.write(f"文件名: {self.filename}\n")
-                f.write("="*70 + "\n")
+            lines = [
+                f"{REPORT_RULE}\n\n",
+                "任务统计信息:\n",
+                f"{REPORT_RULE}\n",
+                f"结束时间: {_now_str()}\n",
+                f"总任务数: {total}\n",
+                f"成功数量: {success}\n",
+                f"失败数量: {failed}\n",
+            ]
+            
+            if extra_stats:
+                for key, value in extra_stats.items():
+                    lines.append(f"{key}: {value}\n")
+            
+            lines.append(f"总耗时: {elapsed:.1f}秒\n")
+            if elapsed > 0:
+                lines.append(f"平均速度: {total/elapsed:.1f} 任务/秒\n")
+            lines.append(f"文件位置: {self.save_dir}\n")
+            lines.append(f"文件名: {self.filename}\n")
+            lines.append(f"{REPORT_RULE}\n")
+            
+            with self._lock:
+                self._fh.write("".join(lines))
         except Exception as e:
             print(f"❌ 完成文件失败: {e}")
+        finally:
+            self.close()
+    
+    def flush(self):
+        """把缓冲中的记录写入文件"""
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.flush()
+    
+    def close(self):
+        """刷新缓冲并关闭文件（可重复调用）"""
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+# ---------- 用户信息接口缓存 ----------
+USER_INFO_CACHE_SIZE = 10_000  # get_complete_user_info 最多缓存的用户数
+USER_INFO_CACHE_TTL = 30 * 60  # 缓存有效期（秒）
+USER_INFO_NEGATIVE_TTL = 60  # 获取失败的用户在此时间内直接返回基础信息，不再重复请求
+USER_INFO_PREFETCH_THREADS = 16  # 按页预取帖子作者信息的并发数
+USER_INFO_TIMEOUT = (3, 5)  # 用户信息接口超时（连接, 读取）
+USER_SHOW_RESPONSE_CACHE_SIZE = 1024  # 最多保留多少个用户的 user/show 原始响应（保存用户档案时复用）
+
+# ---------- 用户信息记录 ----------
+USER_INFO_FIELDS = (
+    "id", "user_id", "user_name", "name", "nick_name",
+    "height", "weight", "age", "birthday",
+    "sex_text", "sex_o_text", "sex_p_text",
+    "country", "country_pic", "last_time", "last_time_raw",
+    "intro", "user_url", "pic", "found_page",
+)
+_USER_INFO_FIELD_SET = frozenset(USER_INFO_FIELDS)
+
+class UserInfo:
+    """用户完整信息：固定字段存在 __slots__ 中（比字典省内存），同时兼容字典式读写"""
+    __slots__ = USER_INFO_FIELDS + ("_extra",)
+    
+    def __init__(self, **fields):
+        self._extra = None  # 非固定字段
+        for key, value in fields.items():
+            self[key] = value
+    
+    def __getitem__(self, key):
+        if key in _USER_INFO_FIELD_SET:
+            try:
+                return getattr(self, key)
+            except AttributeError:  # 未设置的字段与字典缺键一致
+                raise KeyError(key) from None
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+    
+    def __setitem__(self, key, value):
+        if key in _USER_INFO_FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+    
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def items(self):
+        """按字段顺序返回已设置的 (键, 值)；以下划线开头的内部标记（如 _placeholder）不包含在内"""
+        pairs = [(key, getattr(self, key)) for key in USER_INFO_FIELDS if hasattr(self, key)]
+        if self._extra:
+            pairs.extend((k, v) for k, v in self._extra.items() if not k.startswith("_"))
+        return pairs
+    
+    def keys(self):
+        return [key for key, _ in self.items()]
+    
+    def to_dict(self):
+        """转换为普通字典（用于序列化）"""
+        return dict(self.items())
+    
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+    
+    def __repr__(self):
+        return f"UserInfo({self.to_dict()!r})"
+
+# ---------- 用户信息磁盘缓存 ----------
+USER_CACHE_TTL = USER_INFO_CACHE_TTL  # 磁盘缓存有效期（秒），与内存缓存一致，过期后重新从网络获取
+
+class UserInfoStore:
+    """基于 sqlite 的用户信息磁盘缓存，位于 spider 内存缓存之后（多线程共用一个连接，由锁串行化访问）"""
+    def __init__(self, db_path, ttl=USER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, blob TEXT NOT NULL, ts INTEGER NOT NULL)"
+            )
+            # 清理上次运行留下的过期记录
+            self._conn.execute("DELETE FROM users WHERE ts < ?", (int(time.time() - ttl),))
+            self._conn.commit()
+    
+    def get(self, user_id):
+        """读取未过期的用户信息，没有或已过期返回 None"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT blob, ts FROM users WHERE id = ?", (str(user_id),)
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        return UserInfo.from_dict(_json_loads(row[0]))
+    
+    def put(self, user_id, info):
+        """写入（覆盖）用户信息"""
+        try:
+            blob = _json_dumps(info.to_dict())
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO users (id, blob, ts) VALUES (?, ?, ?)",
+                    (str(user_id), blob, int(time.time()))
+                )
+                self._conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            print(f"⚠️ 用户缓存写入失败: {e}")
+    
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
 
 # ---------- 用户名搜索器类 ----------
 class UsernamePostSearcher:
@@ -108,20 +656,11 @@ class UsernamePostSearcher:
         self.found_users = []
         self.lock = threading.Lock()
         self.seen_user_ids = set()
-        self.user_cache = {}  # 用户信息缓存
-        
-    def get_user_full_info_cached(self, user_id):
-        """获取用户信息（带缓存）"""
-        if user_id in self.user_cache:
-            return self.user_cache[user_id]
+        # 页内用户信息并发获取用的线程池（与翻页线程池分开，避免互相等待造成死锁）
+        self.user_executor = ThreadPoolExecutor(max_workers=threads)
+        # 找到的用户先放入队列，由单独的输出线程打印，避免网络线程被终端输出阻塞
+        self.display_queue = queue.Queue()
         
-        full_info = self.spider.get_complete_user_info(user_id)
-        if full_info:
-            self.user_cache[user_id] = full_info
-            return full_info
-        
-        return None
-    
     def search_page(self, page):
         """搜索单个页面"""
         try:
@@ -134,23 +673,27 @@ class UsernamePostSearcher:
             posts = result.get("data", [])
             page_found = 0
             
+            # 收集本页未处理过的用户ID（去重保序），一次性并发获取用户信息
+            page_user_ids = {}
             for post in posts:
-                # 获取用户信息
-                user_info = post.get("user", {})
-                user_id = user_info.get("id") or post.get("user_id")
-                
-                if not user_id:
-                    continue
-                
-                # 获取完整用户信息
-                full_info = self.get_user_full_info_cached(user_id)
+                user_id = _extract_user_id(post)
+                if user_id and user_id not in self.seen_user_ids:
+                    page_user_ids[user_id] = None
+            
+            # 用户信息的缓存（内存 → 磁盘）和并发去重都由 spider.get_complete_user_info 负责
+            futures = {self.user_executor.submit(self.spider.get_complete_user_info, user_id): user_id
+                       for user_id in page_user_ids}
+            
+            for future in as_completed(futures):
+                user_id = futures[future]
+                full_info = future.result()
                 if not full_info:
                     continue
                     
                 username = full_info.get("name", "")
                 
                 # 检查用户名是否包含关键词
-                if user_id and self.keyword in username:
+                if self.keyword in username:
                     with self.lock:
                         if user_id not in self.seen_user_ids:
                             self.seen_user_ids.add(user_id)
@@ -159,21 +702,8 @@ class UsernamePostSearcher:
                             self.found_users.append(full_info)
                             page_found += 1
                             
-                            # 显示找到的用户（统一格式）
-                            count = len(self.found_users)
-                            print(f"\n[{count}] 👤 {full_info['name']} (ID:{full_info['id']}) 第{page}页")
-                            
-                            # 统一显示格式：与关注查询相同
-                            self.spider.display_complete_user_info(full_info)
-                            
-                            # 保存记录
-                            if self.saver:
-                                details = f"用户名: {full_info['name']}"
-                                if full_info.get('sex_text'):
-                                    details += f", 性别: {full_info['sex_text']}"
-                                if full_info.get('sex_p_text'):
-                                    details += f", 属性: {full_info['sex_p_text']}"
-                                self.saver.save_record(f"用户{full_info['id']}", "✅", details)
+                            # 交给输出线程显示，网络线程不在终端输出上排队
+                            self.display_queue.put((len(self.found_users), page, full_info))
             
             # 记录本页统计
             if self.saver:
@@ -185,24 +715,59 @@ class UsernamePostSearcher:
             if self.saver:
                 self.saver.save_record(f"第{page}页", "❌", f"搜索失败: {e}")
     
+    def _display_worker(self):
+        """输出线程：按发现顺序显示找到的用户并保存记录"""
+        while True:
+            item = self.display_queue.get()
+            if item is None:
+                break
+            
+            count, page, full_info = item
+            try:
+                # 显示找到的用户（统一格式）
+                print(f"\n[{count}] 👤 {full_info['name']} (ID:{full_info['id']}) 第{page}页")
+                
+                # 统一显示格式：与关注查询相同
+                self.spider.display_complete_user_info(full_info)
+                
+                # 保存记录
+                if self.saver:
+                    details = f"用户名: {full_info['name']}"
+                    if full_info.get('sex_text'):
+                        details += f", 性别: {full_info['sex_text']}"
+                    if full_info.get('sex_p_text'):
+                        details += f", 属性: {full_info['sex_p_text']}"
+                    self.saver.save_record(f"用户{full_info['id']}", "✅", details)
+            except Exception as e:
+                print(f"⚠️  输出异常: {e}")
+    
     def search_all(self):
         """使用多线程搜索所有页面"""
         print(f"\n🔍 开始多线程搜索... (线程数: {self.threads}, 页数: {self.max_pages})")
         
-        with ThreadPoolExecutor(max_workers=self.threads) as executor:
-            # 提交所有页面任务
-            futures = []
-            for page in range(1, self.max_pages + 1):
-                future = executor.submit(self.search_page, page)
-                futures.append(future)
-                time.sleep(0.1)  # 避免请求过快
-            
-            # 等待所有任务完成
-            for future in as_completed(futures):
-                try:
-                    future.result()
-                except Exception as e:
-                    print(f"⚠️  任务异常: {e}")
+        display_thread = threading.Thread(target=self._display_worker, daemon=True)
+        display_thread.start()
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                # 提交所有页面任务
+                futures = []
+                # 一次性提交，请求频率由 spider.get_posts 内的限速器控制
+                for page in range(1, self.max_pages + 1):
+                    future = executor.submit(self.search_page, page)
+                    futures.append(future)
+                
+                # 等待所有任务完成
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"⚠️  任务异常: {e}")
+        finally:
+            self.user_executor.shutdown(wait=True)
+            # 通知输出线程结束，并等它把剩余结果输出完
+            self.display_queue.put(None)
+            display_thread.join()
         
         return self.found_users
 
@@ -223,25 +788,53 @@ class BDSMForumSpider:
                 data_dir = "bdsm_data"
 
         self.base_url = "https://suo.jiushu1234.com"
+        self.user_show_url = f"{self.base_url}/api.php/user/show"  # 用户信息接口
+        self.vote_check_url = f"{self.base_url}/api.php/play/pds"  # 投票任务检查接口
+        self.vote_do_url = f"{self.base_url}/api.php/play/pd_do"  # 投票接口
         self.token = token
         self.headers = self.get_generic_headers()
 
-        # 列表接口默认 payload
-        self.payload_template = {
-            "page": 1,
-            "order": {"create_time": "desc"},  # 按创建时间倒序（由新到旧）
-            "append": {
-                "1": "files",
-                "3": "is_dig",
-                "6": "play.u",
-                "7": "play_digs",
-                "8": "gt_info",
-                "user": ["sex_text", "sex_p_text", "sex_o_text"]
-            },
-            "with_count": ["comments", "favos", "digs"],
-            "kw": "",
-        }
-
+        # 共享会话：复用 TCP/TLS 长连接，避免每个请求重新握手；所有请求共用站点级限速
+        self.session = RateLimitedSession(RateLimiter(HOST_RATE_LIMIT) if HOST_RATE_LIMIT else None)
+        self.session.headers.update(self.headers)
+        retry = Retry(total=HTTP_CONNECT_RETRIES, connect=HTTP_CONNECT_RETRIES, read=0, status=0,
+                      backoff_factor=HTTP_RETRY_BACKOFF)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session.mount("https://", adapter)
+
+        # 注释JSON渲染缓存：user_id -> 顶层字段渲染缓存（见 format_json_with_comments）
+        self._comment_block_cache = OrderedDict()
+        self._comment_block_cache_lock = threading.Lock()
+
+        # 用户信息缓存：user_id -> (过期时间, UserInfo)
+        self._user_info_cache = OrderedDict()
+        self._user_info_cache_lock = threading.Lock()
+        self._user_info_inflight = {}  # 正在获取中的用户ID -> Event，多线程同时查同一用户时只请求一次
+        # user/show 原始响应：user_id -> 响应（LRU，条数远小于用户信息缓存），见 save_user_info_to_search_dir
+        self._user_show_responses = OrderedDict()
+
+        # 帖子列表请求限速（多线程共用）
+        self.posts_limiter = RateLimiter(POSTS_RATE_LIMIT)
+        # 逐帖保存限速：替代固定间隔的 sleep，耗时已超过间隔的帖子无需再等
+        self.save_limiter = RateLimiter(SAVE_RATE_LIMIT)
+        # 关注列表请求限速（多页并发获取时共用）
+        self.attention_limiter = RateLimiter(ATTENTION_RATE_LIMIT)
+        # 关注数据后台写入（注释渲染 + 写文件），不阻塞下一页的处理
+        self._attention_writer = ThreadPoolExecutor(max_workers=ATTENTION_WRITER_THREADS)
+
+        # 已保存账号索引：token -> 账号，load_accounts/save_accounts 时更新，见 check_token_status
+        self._account_by_token = None
+
+        # Token 验证结果缓存：token -> (过期时间, 是否有效)，见 test_token_valid
+        self._token_valid_cache = {}
+        self._token_valid_cache_lock = threading.Lock()
+        # Token 验证缓存文件：在 _token_valid_cache_lock 外写入，由单独的锁串行化；
+        # 版本号每次修改 _recent_valid_tokens 时加一，写文件时丢弃比已写入版本旧的快照
+        self._token_cache_file_lock = threading.Lock()
+        self._token_cache_version = 0
+        self._token_cache_written = 0
+
+        # 列表翻页状态（请求体见 POSTS_PAYLOAD_TEMPLATE）
         self.current_page = 1
         self.has_more = True
 
@@ -253,10 +846,22 @@ class BDSMForumSpider:
         self.search_dir = os.path.join(data_dir, "搜索")  # 搜索保存目录
         self.accounts_dir = os.path.join(data_dir, "账号")  # 账号保存目录
         self.accounts_file = os.path.join(data_dir, "账号", "accounts.json")  # 账号文件路径
+        self.login_state_path = os.path.join(self.accounts_dir, LOGIN_STATE_FILE)  # 登录状态文件路径
+        self.token_cache_path = os.path.join(self.accounts_dir, TOKEN_CACHE_FILE)  # Token 验证缓存文件路径
         
         # 初始化所有目录
         self.init_data_dirs()
 
+        # 最近验证有效的 Token：sha256(token) -> 验证时间（time.time()），持久化到 token_cache_path
+        self._recent_valid_tokens = self._load_token_cache()
+
+        # 用户信息磁盘缓存（打开失败时退化为仅内存缓存）
+        try:
+            self.user_store = UserInfoStore(os.path.join(data_dir, "user_cache.db"))
+        except sqlite3.Error as e:
+            print(f"⚠️ 用户缓存数据库不可用: {e}")
+            self.user_store = None
+
     # ---------- 工具方法 ----------
     def init_data_dirs(self):
         """初始化数据目录"""
@@ -296,6 +901,7 @@ class BDSMForumSpider:
     def set_token(self, token: str):
         self.token = token
         self.headers["token"] = token
+        self.session.headers["token"] = token
         print(f"✅ Token已设置: {token[:20]}...")
         
         # 保存登录状态
@@ -305,14 +911,13 @@ class BDSMForumSpider:
         """保存登录状态到文件"""
         login_state = {
             "token": token,
-            "last_login": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "last_login": _now_str(),
             "expire_time": time.time() + 30 * 24 * 60 * 60
         }
         try:
             # 保存到账号目录
-            state_file = os.path.join(self.accounts_dir, "login_state.json")
-            with open(state_file, "w", encoding="utf-8") as f:
-                json.dump(login_state, f, ensure_ascii=False, indent=2)
+            state_file = self.login_state_path
+            _atomic_write_bytes(state_file, _json_dumps_bytes(login_state, indent=True))
             print(f"💾 登录状态已保存到账号目录")
         except Exception as e:
             print(f"❌ 保存登录状态失败: {e}")
@@ -321,10 +926,10 @@ class BDSMForumSpider:
         """从文件加载登录状态"""
         try:
             # 从账号目录读取
-            state_file = os.path.join(self.accounts_dir, "login_state.json")
+            state_file = self.login_state_path
             if os.path.exists(state_file):
-                with open(state_file, "r", encoding="utf-8") as f:
-                    login_state = json.load(f)
+                with open(state_file, "rb") as f:
+                    login_state = _json_loads(f.read())
                     
                 # 检查是否过期
                 if login_state.get("expire_time", 0) > time.time():
@@ -341,10 +946,49 @@ class BDSMForumSpider:
             print(f"❌ 读取登录状态失败: {e}")
         return None
 
+    def _load_token_cache(self):
+        """读取 Token 验证缓存文件，丢弃已过期的记录"""
+        try:
+            with open(self.token_cache_path, "rb") as f:
+                cache = _json_loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(cache, dict):
+            return {}
+        cutoff = time.time() - TOKEN_DISK_CACHE_TTL
+        return {k: v for k, v in cache.items() if isinstance(v, (int, float)) and v > cutoff}
+
+    def _snapshot_token_cache(self):
+        """记录一次 _recent_valid_tokens 的修改，返回 (快照, 版本号)（调用方持有 _token_valid_cache_lock）"""
+        self._token_cache_version += 1
+        return dict(self._recent_valid_tokens), self._token_cache_version
+
+    def _save_token_cache(self, snapshot, version):
+        """写入 Token 验证缓存文件（调用方不持有 _token_valid_cache_lock）"""
+        with self._token_cache_file_lock:
+            if version <= self._token_cache_written:
+                return
+            try:
+                _atomic_write_bytes(self.token_cache_path, _json_dumps_bytes(snapshot))
+                self._token_cache_written = version
+            except OSError as e:
+                print(f"⚠️ 保存Token验证缓存失败: {e}")
+
     def clear_login_state(self):
         """清除登录状态"""
+        with self._token_valid_cache_lock:
+            self._token_valid_cache.clear()
+            self._recent_valid_tokens.clear()
+            _, version = self._snapshot_token_cache()
+        with self._token_cache_file_lock:
+            if version > self._token_cache_written:
+                self._token_cache_written = version
+                try:
+                    os.remove(self.token_cache_path)
+                except OSError:
+                    pass
         try:
-            state_file = os.path.join(self.accounts_dir, "login_state.json")
+            state_file = self.login_state_path
             if os.path.exists(state_file):
                 os.remove(state_file)
                 print("🗑️  已清除登录状态")
@@ -354,300 +998,126 @@ class BDSMForumSpider:
     # ---------- JSON注释相关 ----------
     def get_field_comments(self):
         """获取统一的字段注释映射"""
-        return {
-            # 基本字段
-            "id": "ID",
-            "code": "响应代码",
-            "msg": "响应消息",
-            "data": "数据主体",
-            
-            # 分页信息
-            "total": "总记录数",
-            "per_page": "每页数量",
-            "current_page": "当前页码",
-            "last_page": "总页数",
-            
-            # 关注相关
-            "uid": "被关注者用户ID",
-            "attention_id": "关注记录ID",
-            "create_time": "创建时间",
-            "update_time": "更新时间",
-            "user_id": "用户ID",
-            
-            # 帖子相关
-            "status": "状态",
-            "title": "标题",
-            "pic": "头像",
-            "onclick": "浏览量",
-            "play_id": "播放ID",
-            "time_add": "额外时间",
-            "time_end": "结束时间",
-            "gongt_id": "公告ID",
-            "myorder": "排序值",
-            "sex": "性别代码",
-            "rank_time": "排名时间",
-            "nums": "数量",
-            "com_count": "评论数",
-            "dig_count": "点赞数",
-            "rank": "排名",
-            "com_my": "我的评论",
-            "rank_admin": "管理员排名",
-            "counts": "计数",
-            "qr_id": "二维码ID",
-            "video": "视频",
-            "video_poster": "视频封面",
-            "day_rank": "日排名",
-            "create_time1": "创建时间1",
-            "banner": "横幅",
-            "game_id": "游戏ID",
-            "is_zl": "是否置顶",
-            "title_zl": "置顶标题",
-            "tags": "标签",
-            "reason": "原因",
-            "os_id": "操作系统ID",
-            "os_cate": "操作系统分类",
-            "favo_count": "收藏数",
-            "goods_id": "商品ID",
-            "icon_tag": "图标标签",
-            "ip": "IP地址",
-            "is_black": "是否黑名单",
-            "is_wd": "是否违规",
-            "pump_qr_id": "泵二维码ID",
-            "dig_down": "点踩数",
-            "is_hot": "是否热门",
-            "rank_good_bad": "好评差评",
-            "rank_b": "B排名",
-            "count_gz": "关注数",
-            "file_del_num": "删除文件数",
-            "rank_res": "资源排名",
-            "rank_day_hour_time": "日小时排名时间",
-            "rank_day_hour": "日小时排名",
-            "sex_o": "性取向代码",
-            "ext_field": "扩展字段",
-            "files": "图片列表",
-            "is_dig": "是否已点赞",
-            "play": "播放内容",
-            "play_digs": "播放点赞",
-            "gt_info": "其他信息",
-            
-            # 用户信息
-            "user": "用户信息",
-            "user_name": "用户名",
-            "is_admin": "是否管理员",
-            "rz_sex": "认证性别",
-            "tag": "标签",
-            "icons": "图标",
-            "birthday": "生日",
-            "age": "年龄",
-            "country_pic": "国旗图片",
-            "sex_p": "角色代码",
-            "jg_num": "警告次数",
-            "pic_border": "头像边框",
-            "sex_text": "性别",
-            "sex_p_text": "角色",
-            "sex_o_text": "性取向",
-            "nick_name": "昵称",
-            "intro": "个人简介",
-            "country": "地区",
-            "height": "身高",
-            "weight": "体重",
-            "last_time": "最后在线时间",
-            "update_time": "更新时间",
-            "money": "余额",
-            "user_group_id": "用户组ID",
-            "name": "真实姓名",
-            "leader": "是否为领导",
-            "address": "地址",
-            "fen": "积分",
-            "group_time": "入群时间",
-            "openid": "微信openid",
-            "keys": "钥匙数量",
-            "is_chat": "是否允许聊天",
-            "is_check": "是否已验证",
-            "is_delc": "是否已删除",
-            "fsr_friend": "好友数",
-            "fsr_sm": "SM相关数",
-            "fsr_circle": "圈子数",
-            "time_cold": "冷却时间",
-            "is_cold": "是否冷却中",
-            "is_has_ele": "是否有元素",
-            "ele_cold_num": "元素冷却数量",
-            "ele_cold": "元素冷却",
-            "last_ele_link": "最后元素链接时间",
-            "crank": "排名",
-            "rank_code": "等级代码",
-            "quick_dels": "快速删除设置",
-            "quick_orders": "快速排序设置",
-            "star_color": "星星颜色",
-            "rank_code1": "等级代码1",
-            "rank_code2": "等级代码2",
-            "last_line": "最后线路",
-            "friend_time": "成为好友时间",
-            "pump_rate": "泵率",
-            "is_dh": "是否为DH",
-            "is_no_circle": "是否无圈子",
-            "is_unlock": "是否解锁",
-            "is_rl": "是否为RL",
-            "sex_cert": "性别认证",
-            "zuan": "钻石数量",
-            
-            # files 数组内部字段翻译
-            "table_name": "表名",
-            "data_id": "数据ID",
-            "basename": "基础名称",
-            "extension": "扩展名",
-            "field": "字段名",
-            "filename": "文件名",
-            "size": "大小",
-            "type": "类型",
-            "url": "图片链接",
-            "ges": "其他信息",
-            "check_code": "检查代码",
-            "wavs": "音频信息",
-            
-            # 查询信息
-            "_query_info": "查询信息",
-            "_note": "注释说明",
-            "api_response": "API响应数据",
-            "query_time": "查询时间",
-            "query_timestamp": "查询时间戳",
-        }
+        return FIELD_COMMENTS
 
-    def format_json_with_comments(self, data: Dict) -> str:
-        """生成带中文注释的JSON格式字符串"""
+    def format_json_with_comments(self, data: Dict, block_cache: Optional[Dict] = None) -> str:
+        """
+        生成带中文注释的JSON格式字符串
+        block_cache: 可选的顶层字段渲染缓存 {字段名: (值对象, 渲染文本, 是否需要逗号)}，
+                     只缓存 COMMENT_CACHEABLE_FIELDS 中的字段，值还是同一个对象时直接复用文本
+        """
         if not data:
             return "{}"
         
-        field_comments = self.get_field_comments()
+        field_comments = FIELD_COMMENTS
         
-        def format_value(key, value, level, indent="  "):
-            indent_str = indent * level
+        def write_field(out, key, value, level):
+            """写入单个字段（不含行尾的逗号和换行），返回该字段后面是否需要逗号"""
+            indent_str = JSON_INDENTS[level] if level < len(JSON_INDENTS) else "  " * level
             comment = field_comments.get(key, "")
             comment_str = f"  // {comment}" if comment else ""
             
             if isinstance(value, dict):
                 if not value:
-                    return f'{indent_str}"{key}": {{{comment_str}\n{indent_str}}},\n'
+                    out.append(f'{indent_str}"{key}": {{{comment_str}\n{indent_str}}}')
+                    return True
                 
-                formatted = f'{indent_str}"{key}": {{{comment_str}\n'
+                out.append(f'{indent_str}"{key}": {{{comment_str}\n')
                 keys_list = list(value.keys())
                 
                 # 特殊处理：u字段不翻译
                 if key == "u":
                     keys_list = ["id"] + [k for k in keys_list if k != "id"]
                 
-                for i, k in enumerate(keys_list):
-                    v = value[k]
-                    is_last = i == len(keys_list) - 1
-                    formatted_line = format_value(k, v, level + 1, indent)
-                    if is_last and formatted_line.endswith(",\n"):
-                        formatted_line = formatted_line[:-2] + "\n"
-                    formatted += formatted_line
-                
-                formatted += f'{indent_str}}}'
-                if level > 0 and not (level == 2 and key == "user"):
-                    formatted += ","
-                formatted += "\n"
-                return formatted
+                write_fields(out, value, keys_list, level + 1)
+                out.append(f'{indent_str}}}')
+                return not (level == 2 and key == "user")
                 
             elif isinstance(value, list):
                 if not value:
-                    return f'{indent_str}"{key}": []{comment_str},\n'
+                    out.append(f'{indent_str}"{key}": []{comment_str}')
+                    return True
                 
-                formatted = f'{indent_str}"{key}": [{comment_str}\n'
+                out.append(f'{indent_str}"{key}": [{comment_str}\n')
                 for i, item in enumerate(value):
+                    if i:
+                        out.append(",\n")
                     if isinstance(item, dict):
-                        formatted += f'{indent_str}  {{\n'
+                        out.append(f'{indent_str}  {{\n')
                         item_keys = list(item.keys())
                         
                         # 特殊处理：u字段不翻译
                         if "u" in item_keys:
                             item_keys = ["id"] + [k for k in item_keys if k != "id"]
                         
-                        for j, k in enumerate(item_keys):
-                            v = item[k]
-                            is_last_item = j == len(item_keys) - 1
-                            item_formatted = format_value(k, v, level + 2, indent)
-                            if is_last_item and item_formatted.endswith(",\n"):
-                                item_formatted = item_formatted[:-2] + "\n"
-                            formatted += item_formatted
-                        formatted += f'{indent_str}  }}'
+                        if item_keys:
+                            write_fields(out, item, item_keys, level + 2)
+                        out.append(f'{indent_str}  }}')
+                    elif isinstance(item, str):
+                        out.append(f'{indent_str}  {_json_dumps(item)}')
                     else:
-                        item_str = json.dumps(item, ensure_ascii=False)
-                        formatted += f'{indent_str}  {item_str}'
-                    
-                    if i < len(value) - 1:
-                        formatted += ",\n"
-                    else:
-                        formatted += f'\n{indent_str}]'
-                
-                if level > 0:
-                    formatted += ","
-                formatted += "\n"
-                return formatted
+                        out.append(f'{indent_str}  {json.dumps(item, ensure_ascii=False)}')
+                out.append(f'\n{indent_str}]')
+                return True
                 
             else:
-                formatted = f'{indent_str}"{key}": '
                 if value is None:
-                    formatted += "null"
+                    value_str = "null"
                 elif isinstance(value, str):
-                    escaped = json.dumps(value, ensure_ascii=False)
-                    formatted += escaped
+                    value_str = _json_dumps(value)
                 elif isinstance(value, bool):
-                    formatted += str(value).lower()
+                    value_str = str(value).lower()
                 else:
-                    formatted += str(value)
+                    value_str = str(value)
                 
-                formatted += f'{comment_str},\n'
-                return formatted
+                out.append(f'{indent_str}"{key}": {value_str}{comment_str}')
+                return True
+        
+        def write_fields(out, mapping, keys_list, level):
+            """依次写入多个字段：逗号写在下一个字段之前，最后一个字段后只换行"""
+            needs_comma = None
+            for k in keys_list:
+                if needs_comma is not None:
+                    out.append(",\n" if needs_comma else "\n")
+                needs_comma = write_field(out, k, mapping[k], level)
+            out.append("\n")
         
         # 开始构建JSON
-        result = "{\n"
         keys = list(data.keys())
         
         # 检测数据类型：关注数据有特殊字段，帖子数据没有
-        is_attention_data = any(field in keys for field in ["_query_info", "_note", "api_response"])
-        
-        if is_attention_data:
-            # 关注数据：确保特殊字段在前
-            priority_fields = []
-            for field in ["_query_info", "_note", "api_response"]:
-                if field in keys:
-                    priority_fields.append(field)
-                    keys.remove(field)
-            
-            # 添加其他标准字段
-            for field in ["id", "create_time", "user_id"]:
-                if field in keys:
-                    priority_fields.append(field)
-                    keys.remove(field)
-                    
-            keys = priority_fields + keys
+        if not ATTENTION_ONLY_FIELDS.isdisjoint(data):
+            # 关注数据：特殊字段在前，其次是标准字段
+            priority = ATTENTION_FIELD_PRIORITY
         else:
-            # 帖子数据：确保常用字段在前
-            priority_fields = []
-            for field in ["id", "create_time", "user_id", "title", "content"]:
-                if field in keys:
-                    priority_fields.append(field)
-                    keys.remove(field)
-                    
-            keys = priority_fields + keys
+            # 帖子数据：常用字段在前
+            priority = POST_FIELD_PRIORITY
         
-        for i, key in enumerate(keys):
-            value = data[key]
-            is_last = i == len(keys) - 1
-            formatted = format_value(key, value, 1)
-            
-            if is_last and formatted.endswith(",\n"):
-                formatted = formatted[:-2] + "\n"
-            
-            result += formatted
+        # 稳定排序：优先字段按指定顺序放前面，其余字段保持原顺序
+        rest = len(priority)
+        keys.sort(key=lambda k: priority.get(k, rest))
         
-        if result.endswith(",\n"):
-            result = result[:-2] + "\n"
-        
-        result += "}"
-        return result
+        out = ["{\n"]
+        if block_cache is None:
+            write_fields(out, data, keys, 1)
+        else:
+            needs_comma = None
+            for k in keys:
+                if needs_comma is not None:
+                    out.append(",\n" if needs_comma else "\n")
+                value = data[k]
+                cached = block_cache.get(k)
+                if cached is not None and cached[0] is value:
+                    out.append(cached[1])
+                    needs_comma = cached[2]
+                    continue
+                start = len(out)
+                needs_comma = write_field(out, k, value, 1)
+                if k in COMMENT_CACHEABLE_FIELDS:
+                    block_cache[k] = (value, "".join(out[start:]), needs_comma)
+            out.append("\n")
+        out.append("}")
+        return "".join(out)
 
     # ---------- 统一帖子显示函数 ----------
     def display_post_for_browsing(self, post_data: Dict, index: int = None):
@@ -686,33 +1156,42 @@ class BDSMForumSpider:
             print(f"   👤 用户: {complete_user_info.get('name', f'用户_{user_id}')} (ID: {user_id})")
             
             # 显示详细的用户信息（统一格式）
-            if complete_user_info.get('age'):
-                print(f"   🎂 年龄: {complete_user_info['age']}", end="")
-                if complete_user_info.get('birthday'):
-                    print(f" | 生日: {complete_user_info['birthday']}")
+            age = complete_user_info.get('age')
+            if age:
+                print(f"   🎂 年龄: {age}", end="")
+                birthday = complete_user_info.get('birthday')
+                if birthday:
+                    print(f" | 生日: {birthday}")
                 else:
                     print()
             
-            if complete_user_info.get('sex_text'):
-                gender_info = f"性别: {complete_user_info['sex_text']}"
-                if complete_user_info.get('sex_o_text'):
-                    gender_info += f" | 性取向: {complete_user_info['sex_o_text']}"
-                if complete_user_info.get('sex_p_text'):
-                    gender_info += f" | 角色: {complete_user_info['sex_p_text']}"
+            sex_text = complete_user_info.get('sex_text')
+            if sex_text:
+                gender_info = f"性别: {sex_text}"
+                sex_o_text = complete_user_info.get('sex_o_text')
+                if sex_o_text:
+                    gender_info += f" | 性取向: {sex_o_text}"
+                sex_p_text = complete_user_info.get('sex_p_text')
+                if sex_p_text:
+                    gender_info += f" | 角色: {sex_p_text}"
                 print(f"   ⚧️  {gender_info}")
             
-            if complete_user_info.get('height'):
-                print(f"   📏 身高: {complete_user_info['height']}", end="")
-                if complete_user_info.get('weight'):
-                    print(f" | 体重: {complete_user_info['weight']}")
+            height = complete_user_info.get('height')
+            if height:
+                print(f"   📏 身高: {height}", end="")
+                weight = complete_user_info.get('weight')
+                if weight:
+                    print(f" | 体重: {weight}")
                 else:
                     print()
             
-            if complete_user_info.get('country'):
-                print(f"   📍 地区: {complete_user_info['country']}")
+            country = complete_user_info.get('country')
+            if country:
+                print(f"   📍 地区: {country}")
             
-            if complete_user_info.get('last_time'):
-                print(f"   ⏰ 最后在线: {complete_user_info['last_time']}")
+            last_time = complete_user_info.get('last_time')
+            if last_time:
+                print(f"   ⏰ 最后在线: {last_time}")
         
         elif user_info.get('user_name'):
             # 如果获取不到完整信息，至少显示用户名
@@ -720,7 +1199,7 @@ class BDSMForumSpider:
         
         # 显示帖子发布时间
         if post_data.get('create_time'):
-            create_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(post_data.get("create_time", 0)))
+            create_time = _fmt_ts(post_data.get("create_time", 0))
             print(f"   📅 发布时间: {create_time}")
         
         # 显示帖子内容（始终显示）
@@ -775,19 +1254,110 @@ class BDSMForumSpider:
                 print(f"   📁 附件数量: {len(files)}个 [无有效图片链接]")
 
     # ---------- 统一用户信息获取和展示 ----------
+    def _get_cached_user_info(self, user_id):
+        """读取未过期的用户信息缓存，没有返回 None"""
+        with self._user_info_cache_lock:
+            entry = self._user_info_cache.get(user_id)
+            if entry is None:
+                return None
+            expires_at, info = entry
+            if time.monotonic() > expires_at:
+                del self._user_info_cache[user_id]
+                return None
+            self._user_info_cache.move_to_end(user_id)
+            return info
+
+    def _put_cached_user_info(self, user_id, info, ttl=USER_INFO_CACHE_TTL):
+        """写入用户信息缓存，超出上限时淘汰最久未使用的"""
+        with self._user_info_cache_lock:
+            self._user_info_cache[user_id] = (time.monotonic() + ttl, info)
+            self._user_info_cache.move_to_end(user_id)
+            if len(self._user_info_cache) > USER_INFO_CACHE_SIZE:
+                self._user_info_cache.popitem(last=False)
+
+    def _put_user_show_response(self, user_id, data):
+        """保留 user/show 原始响应，超出上限时淘汰最久未使用的"""
+        with self._user_info_cache_lock:
+            self._user_show_responses[user_id] = data
+            self._user_show_responses.move_to_end(user_id)
+            if len(self._user_show_responses) > USER_SHOW_RESPONSE_CACHE_SIZE:
+                self._user_show_responses.popitem(last=False)
+
+    def _get_user_show_response(self, user_id):
+        """读取保留的 user/show 原始响应，没有返回 None"""
+        with self._user_info_cache_lock:
+            data = self._user_show_responses.get(user_id)
+            if data is not None:
+                self._user_show_responses.move_to_end(user_id)
+            return data
+
+    def prefetch_user_infos(self, posts, threads=USER_INFO_PREFETCH_THREADS):
+        """
+        并发获取一批帖子作者的用户信息写入缓存
+        之后逐帖显示/保存时直接命中缓存，不再一个个串行请求
+        """
+        user_ids = {}
+        for post in posts:
+            if isinstance(post, dict):
+                user_id = _extract_user_id(post)
+                if user_id and self._get_cached_user_info(user_id) is None:
+                    user_ids[user_id] = None
+        if len(user_ids) < 2:
+            return
+        with ThreadPoolExecutor(max_workers=min(threads, len(user_ids))) as executor:
+            list(executor.map(self.get_complete_user_info, user_ids))
+
     def get_complete_user_info(self, user_id):
         """
         获取完整的用户信息（统一格式）
         返回：身高、体重、生日、性别、性取向、角色、用户ID、用户名、最后在线时间
         """
+        cached = self._get_cached_user_info(user_id)
+        if cached is not None:
+            return cached
+        
+        with self._user_info_cache_lock:
+            event = self._user_info_inflight.get(user_id)
+            is_owner = event is None
+            if is_owner:
+                event = self._user_info_inflight[user_id] = threading.Event()
+        
+        # 其他线程正在获取该用户，等它完成后直接读缓存
+        if not is_owner:
+            event.wait()
+            cached = self._get_cached_user_info(user_id)
+            if cached is not None:
+                return cached
+            return self._fetch_complete_user_info(user_id)
+        
+        try:
+            # 内存缓存未命中时先查磁盘缓存，再请求网络
+            store = self.user_store
+            if store is not None:
+                stored = store.get(user_id)
+                if stored is not None:
+                    self._put_cached_user_info(user_id, stored)
+                    return stored
+            
+            info = self._fetch_complete_user_info(user_id)
+            # 获取失败的占位信息不写入磁盘缓存
+            if store is not None and not info.get("_placeholder"):
+                store.put(user_id, info)
+            return info
+        finally:
+            with self._user_info_cache_lock:
+                self._user_info_inflight.pop(user_id, None)
+            event.set()
+
+    def _fetch_complete_user_info(self, user_id):
+        """请求 user/show 接口并写入缓存；失败时缓存并返回占位信息"""
         try:
-            r = requests.post(
-                f"{self.base_url}/api.php/user/show",
-                headers=self.headers,
+            r = self.session.post(
+                self.user_show_url,
                 json={"id": user_id},
-                timeout=10
+                timeout=USER_INFO_TIMEOUT
             )
-            data = r.json()
+            data = _json_loads(r.content)
             
             if data.get("code") == 1 and data.get("data"):
                 user = data["data"]
@@ -799,76 +1369,83 @@ class BDSMForumSpider:
                     try:
                         # 假设是时间戳
                         if isinstance(last_time_raw, (int, float)) and last_time_raw > 0:
-                            last_time_str = datetime.fromtimestamp(last_time_raw).strftime("%Y-%m-%d %H:%M:%S")
+                            last_time_str = _fmt_ts(last_time_raw)
                         else:
                             last_time_str = str(last_time_raw)
                     except:
                         last_time_str = str(last_time_raw)
                 
                 # 构建完整的用户信息（统一字段）
-                complete_info = {
+                complete_info = UserInfo(
                     # 核心信息
-                    "id": user_id,
-                    "user_id": user_id,
-                    "user_name": user.get("user_name", f"用户_{user_id}"),
-                    "name": user.get("user_name", f"用户_{user_id}"),
-                    "nick_name": user.get("nick_name", ""),
+                    id=user_id,
+                    user_id=user_id,
+                    user_name=user.get("user_name", f"用户_{user_id}"),
+                    name=user.get("user_name", f"用户_{user_id}"),
+                    nick_name=user.get("nick_name", ""),
                     
                     # 身体信息
-                    "height": user.get("height", ""),
-                    "weight": user.get("weight", ""),
+                    height=user.get("height", ""),
+                    weight=user.get("weight", ""),
                     
                     # 年龄生日
-                    "age": user.get("age", ""),
-                    "birthday": user.get("birthday", ""),
+                    age=user.get("age", ""),
+                    birthday=user.get("birthday", ""),
                     
                     # 性别角色
-                    "sex_text": self.get_sex_text(user),
-                    "sex_o_text": self.get_sex_o_text(user),
-                    "sex_p_text": self.get_sex_p_text(user),
+                    sex_text=self.get_sex_text(user),
+                    sex_o_text=self.get_sex_o_text(user),
+                    sex_p_text=self.get_sex_p_text(user),
                     
                     # 地区
-                    "country": user.get("country", ""),
-                    "country_pic": user.get("country_pic", ""),
+                    country=user.get("country", ""),
+                    country_pic=user.get("country_pic", ""),
                     
                     # 最后在线时间
-                    "last_time": last_time_str,
-                    "last_time_raw": last_time_raw,
+                    last_time=last_time_str,
+                    last_time_raw=last_time_raw,
                     
                     # 其他可能需要的字段
-                    "intro": user.get("intro", ""),
-                    "user_url": f"{self.base_url}/pd/#/page/user_show/user_show?id={user_id}",
-                    "pic": user.get("country_pic", ""),
-                }
+                    intro=user.get("intro", ""),
+                    user_url=f"{self.base_url}/pd/#/page/user_show/user_show?id={user_id}",
+                    pic=user.get("country_pic", ""),
+                )
+                # 原始接口响应单独保留（不放进用户信息），保存用户档案时无需再次请求
+                self._put_user_show_response(user_id, data)
+                self._put_cached_user_info(user_id, complete_info)
                 return complete_info
                 
         except Exception as e:
             print(f"❌ 获取用户{user_id}信息失败: {e}")
         
-        # 如果获取失败，返回基础信息
-        return {
-            "id": user_id,
-            "user_id": user_id,
-            "user_name": f"用户_{user_id}",
-            "name": f"用户_{user_id}",
-            "height": "",
-            "weight": "",
-            "age": "",
-            "birthday": "",
-            "sex_text": "",
-            "sex_o_text": "",
-            "sex_p_text": "",
-            "country": "",
-            "last_time": "",
-            "user_url": f"{self.base_url}/pd/#/page/user_show/user_show?id={user_id}",
-        }
+        # 如果获取失败，返回基础信息（短时间缓存，避免反复请求失败的接口）
+        placeholder = UserInfo(
+            id=user_id,
+            user_id=user_id,
+            user_name=f"用户_{user_id}",
+            name=f"用户_{user_id}",
+            height="",
+            weight="",
+            age="",
+            birthday="",
+            sex_text="",
+            sex_o_text="",
+            sex_p_text="",
+            country="",
+            last_time="",
+            user_url=f"{self.base_url}/pd/#/page/user_show/user_show?id={user_id}",
+            _placeholder=True,
+        )
+        self._put_cached_user_info(user_id, placeholder, USER_INFO_NEGATIVE_TTL)
+        return placeholder
 
-    def display_complete_user_info(self, user_info, prefix="   ", compact=False):
+    def display_complete_user_info(self, user_info, prefix="   ", compact=False, out=None):
         """
         统一显示用户完整信息
         user_info: 用户信息字典
         prefix: 显示前缀
         compact: 是否紧凑模式
+        out: 可选的行列表，提供时把要显示的行追加进去而不直接输出（由调用方统一输出）
         """
         if not user_info:
             return
@@ -877,123 +1454,138 @@ class BDSMForumSpider:
         username = user_info.get('name', '')
         user_id = user_info.get('id', '')
         
-        if not compact:
-            print(f"{prefix}👤 {username} (ID:{user_id})")
-        
         info_lines = []
         
         # 年龄生日
         age_info = ""
-        if user_info.get('age'):
-            age_info = f"年龄: {user_info['age']}岁"
-            if user_info.get('birthday'):
-                age_info += f" | 生日: {user_info['birthday']}"
+        age = user_info.get('age')
+        if age:
+            age_info = f"年龄: {age}岁"
+            birthday = user_info.get('birthday')
+            if birthday:
+                age_info += f" | 生日: {birthday}"
             info_lines.append(age_info)
         
         # 性别、性取向、角色
         gender_info_parts = []
-        if user_info.get('sex_text'):
-            gender_info_parts.append(f"性别: {user_info['sex_text']}")
-        if user_info.get('sex_o_text'):
-            gender_info_parts.append(f"性取向: {user_info['sex_o_text']}")
-        if user_info.get('sex_p_text'):
-            gender_info_parts.append(f"角色: {user_info['sex_p_text']}")
+        sex_text = user_info.get('sex_text')
+        if sex_text:
+            gender_info_parts.append(f"性别: {sex_text}")
+        sex_o_text = user_info.get('sex_o_text')
+        if sex_o_text:
+            gender_info_parts.append(f"性取向: {sex_o_text}")
+        sex_p_text = user_info.get('sex_p_text')
+        if sex_p_text:
+            gender_info_parts.append(f"角色: {sex_p_text}")
         
         if gender_info_parts:
             info_lines.append(" | ".join(gender_info_parts))
         
         # 身高体重
-        if user_info.get('height'):
-            body_info = f"身高: {user_info['height']}cm"
-            if user_info.get('weight'):
-                body_info += f" | 体重: {user_info['weight']}kg"
+        height = user_info.get('height')
+        if height:
+            body_info = f"身高: {height}cm"
+            weight = user_info.get('weight')
+            if weight:
+                body_info += f" | 体重: {weight}kg"
             info_lines.append(body_info)
         
         # 地区
-        if user_info.get('country'):
-            info_lines.append(f"地区: {user_info['country']}")
+        country = user_info.get('country')
+        if country:
+            info_lines.append(f"地区: {country}")
         
         # 最后在线时间
-        if user_info.get('last_time'):
-            info_lines.append(f"最后在线: {user_info['last_time']}")
+        last_time = user_info.get('last_time')
+        if last_time:
+            info_lines.append(f"最后在线: {last_time}")
         
-        # 显示所有信息行
-        for line in info_lines:
-            print(f"{prefix}{line}")
-        
-        # 如果不是紧凑模式，显示分隔线
-        if not compact and info_lines:
-            print(f"{prefix}{'-' * 40}")
+        # 所有行拼好后一次输出，避免逐行 print
+        out_lines = [f"{prefix}{line}" for line in info_lines]
+        if not compact:
+            out_lines.insert(0, f"{prefix}👤 {username} (ID:{user_id})")
+            # 非紧凑模式有信息时显示分隔线
+            if info_lines:
+                out_lines.append(f"{prefix}{'-' * 40}")
+        if out is not None:
+            out.extend(out_lines)
+        elif out_lines:
+            print("\n".join(out_lines))
 
     def get_sex_text(self, user):
         """获取性别文本"""
         sex_text = user.get("sex_text")
-        if sex_text and sex_text != "未知" and not sex_text.startswith("用户_"):
+        if _is_real_text(sex_text):
             return sex_text
-        sex_map = {1: "男", 2: "女", 3: "伪娘", 4: "跨性别男性", 5: "跨性别女性"}
-        sex_val = user.get("sex", 0)
-        return sex_map.get(sex_val, "")
+        return SEX_TEXT_MAP.get(user.get("sex", 0), "")
 
     def get_sex_o_text(self, user):
         """获取性取向文本"""
         sex_o_text = user.get("sex_o_text")
-        if sex_o_text and sex_o_text != "未知" and not sex_o_text.startswith("用户_"):
+        if _is_real_text(sex_o_text):
             return sex_o_text
-        sex_o_map = {1: "双重", 2: "异性恋", 3: "男同", 4: "女同", 0: ""}
         sex_o_raw = user.get("sex_o", 0)
         if isinstance(sex_o_raw, str) and sex_o_raw.isdigit():
             sex_o_raw = int(sex_o_raw)
-        return sex_o_map.get(sex_o_raw, "")
+        return SEX_O_TEXT_MAP.get(sex_o_raw, "")
 
     def get_sex_p_text(self, user):
         """获取属性文本"""
         sex_p_text = user.get("sex_p_text")
-        if sex_p_text and sex_p_text != "未知" and not sex_p_text.startswith("用户_"):
+        if _is_real_text(sex_p_text):
             return sex_p_text
-        sex_p_map = {1: "Dom", 2: "Sub", 3: "S", 4: "M", 5: "Switch", 0: ""}
-        return sex_p_map.get(user.get("sex_p", 0), "")
+        return SEX_P_TEXT_MAP.get(user.get("sex_p", 0), "")
 
     def format_user_archive_text(self, user_info):
         """格式化用户档案文本"""
-        text = f"{'='*60}\n👤 帖子用户档案\n{'='*60}\n"
-        text += f"用户ID: {user_info['id']}\n"
+        parts = [f"{'='*60}\n👤 帖子用户档案\n{'='*60}\n"]
+        parts.append(f"用户ID: {user_info['id']}\n")
         
         # 修复这行：避免嵌套f-string
         user_name = user_info.get('name', f'用户_{user_info["id"]}')
-        text += f"用户名: {user_name}\n"
+        parts.append(f"用户名: {user_name}\n")
         
         # 年龄生日
-        if user_info.get('age') and user_info['age'] != "未知":
-            text += f"年龄: {user_info['age']}岁\n"
-        if user_info.get('birthday') and user_info['birthday'] != "未知":
-            text += f"生日: {user_info['birthday']}\n"
+        age = user_info.get('age')
+        if _is_known(age):
+            parts.append(f"年龄: {age}岁\n")
+        birthday = user_info.get('birthday')
+        if _is_known(birthday):
+            parts.append(f"生日: {birthday}\n")
         
         # 性别、性取向、角色
-        if user_info.get('sex_text') and user_info['sex_text'] != "未知":
-            text += f"性别: {user_info['sex_text']}\n"
-        if user_info.get('sex_o_text') and user_info['sex_o_text'] != "未知":
-            text += f"性取向: {user_info['sex_o_text']}\n"
-        if user_info.get('sex_p_text') and user_info['sex_p_text'] != "未知":
-            text += f"角色: {user_info['sex_p_text']}\n"
+        sex_text = user_info.get('sex_text')
+        if _is_known(sex_text):
+            parts.append(f"性别: {sex_text}\n")
+        sex_o_text = user_info.get('sex_o_text')
+        if _is_known(sex_o_text):
+            parts.append(f"性取向: {sex_o_text}\n")
+        sex_p_text = user_info.get('sex_p_text')
+        if _is_known(sex_p_text):
+            parts.append(f"角色: {sex_p_text}\n")
         
         # 身高体重
-        if user_info.get('height'):
-            text += f"身高: {user_info['height']}cm\n"
-        if user_info.get('weight'):
-            text += f"体重: {user_info['weight']}kg\n"
+        height = user_info.get('height')
+        if height:
+            parts.append(f"身高: {height}cm\n")
+        weight = user_info.get('weight')
+        if weight:
+            parts.append(f"体重: {weight}kg\n")
         
         # 地区
-        if user_info.get('country'):
-            text += f"地区: {user_info['country']}\n"
+        country = user_info.get('country')
+        if country:
+            parts.append(f"地区: {country}\n")
         
         # 最后在线时间
-        if user_info.get('last_time'):
-            text += f"最后在线时间: {user_info['last_time']}\n"
+        last_time = user_info.get('last_time')
+        if last_time:
+            parts.append(f"最后在线时间: {last_time}\n")
         
-        text += f"档案创建时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-        text += f"{'='*60}\n📝 帖子列表\n{'='*60}\n"
+        parts.append(f"档案创建时间: {_now_str()}\n")
+        parts.append(f"{'='*60}\n📝 帖子列表\n{'='*60}\n")
         
-        return text
+        return "".join(parts)
 
     # ---------- 用户名搜索功能 ----------
     def search_username(self):
@@ -1059,19 +1651,21 @@ class BDSMForumSpider:
         # 统计信息
         if found_users:
             print("\n📊 用户统计:")
-            sex_count = {}
-            sex_o_count = {}
-            sex_p_count = {}
+            sex_count = Counter()
+            sex_o_count = Counter()
+            sex_p_count = Counter()
             
+            # 单次遍历统计，空值和“未知”不计入
             for user in found_users:
-                sex_count[user.get('sex_text', '未知')] = sex_count.get(user.get('sex_text', '未知'), 0) + 1
-                sex_o_count[user.get('sex_o_text', '未知')] = sex_o_count.get(user.get('sex_o_text', '未知'), 0) + 1
-                sex_p_count[user.get('sex_p_text', '未知')] = sex_p_count.get(user.get('sex_p_text', '未知'), 0) + 1
-            
-            # 过滤空值
-            sex_count = {k: v for k, v in sex_count.items() if k and k != '未知'}
-            sex_o_count = {k: v for k, v in sex_o_count.items() if k and k != '未知'}
-            sex_p_count = {k: v for k, v in sex_p_count.items() if k and k != '未知'}
+                sex_text = user.get('sex_text')
+                sex_o_text = user.get('sex_o_text')
+                sex_p_text = user.get('sex_p_text')
+                if _is_known(sex_text):
+                    sex_count[sex_text] += 1
+                if _is_known(sex_o_text):
+                    sex_o_count[sex_o_text] += 1
+                if _is_known(sex_p_text):
+                    sex_p_count[sex_p_text] += 1
             
             if sex_count:
                 print(f"  性别: {', '.join([f'{k}:{v}人' for k, v in sex_count.items()])}")
@@ -1083,11 +1677,7 @@ class BDSMForumSpider:
         # 自动保存找到的用户到搜索目录
         if found_users:
             print("\n💾 正在保存用户信息到搜索目录...")
-            saved_count = 0
-            for user in found_users:
-                if self.save_user_info_to_search_dir(user):
-                    saved_count += 1
-                time.sleep(0.1)
+            saved_count = self.save_users_to_search_dir(found_users, threads)
             print(f"✅ 已将 {saved_count}/{len(found_users)} 个用户保存到 {self.search_dir}/")
         
         return found_users
@@ -1117,74 +1707,91 @@ class BDSMForumSpider:
         else:
             print(f"❌ 未找到用户ID: {user_id}")
 
-    def save_user_info_to_search_dir(self, user_info):
-        """保存用户信息到搜索目录（完整格式 + JSON注释数据）"""
+    def save_user_info_to_search_dir(self, user_info, now_str=None):
+        """保存用户信息到搜索目录（完整格式 + JSON注释数据）；now_str 为批量保存时统一的时间字符串"""
         try:
-            # 确保搜索目录存在
-            os.makedirs(self.search_dir, exist_ok=True)
+            if now_str is None:
+                now_str = _now_str()
             
+            # 搜索目录已在 init_data_dirs 中创建，批量保存时不再逐个检查
             user_id = user_info['id']
             username = user_info.get('name', f"用户_{user_id}")
             
             # 使用用户名而不是"用户_ID"
-            safe_name = INVALID_CHARS.sub("_", username)[:20] if username else f"用户_{user_id}"
+            safe_name = username[:20].translate(INVALID_CHARS_TABLE) if username else f"用户_{user_id}"
             filename = f"{user_id}_{safe_name}.txt"
             filepath = os.path.join(self.search_dir, filename)
             
             # 构建用户档案文本（完整格式）
-            post_text = f"{'='*60}\n🔍 用户搜索结果档案\n{'='*60}\n"
-            post_text += f"👤 用户ID: {user_id}\n"
-            post_text += f"📛 用户名: {username}\n"
+            parts = [f"{'='*60}\n🔍 用户搜索结果档案\n{'='*60}\n"]
+            parts.append(f"👤 用户ID: {user_id}\n")
+            parts.append(f"📛 用户名: {username}\n")
             
             # 昵称（如果有）
-            if user_info.get('nick_name'):
-                post_text += f"🏷️  昵称: {user_info['nick_name']}\n"
+            nick_name = user_info.get('nick_name')
+            if nick_name:
+                parts.append(f"🏷️  昵称: {nick_name}\n")
             
             # 年龄生日
-            if user_info.get('age') and user_info['age'] != "未知":
-                post_text += f"🎂 年龄: {user_info['age']}岁\n"
-            if user_info.get('birthday') and user_info['birthday'] != "未知":
-                post_text += f"📅 生日: {user_info['birthday']}\n"
+            age = user_info.get('age')
+            if _is_known(age):
+                parts.append(f"🎂 年龄: {age}岁\n")
+            birthday = user_info.get('birthday')
+            if _is_known(birthday):
+                parts.append(f"📅 生日: {birthday}\n")
             
             # 性别、性取向、角色
-            if user_info.get('sex_text') and user_info['sex_text'] != "未知":
-                post_text += f"⚧️ 性别: {user_info['sex_text']}\n"
-            if user_info.get('sex_o_text') and user_info['sex_o_text'] != "未知":
-                post_text += f"💝 性取向: {user_info['sex_o_text']}\n"
-            if user_info.get('sex_p_text') and user_info['sex_p_text'] != "未知":
-                post_text += f"🎭 角色: {user_info['sex_p_text']}\n"
+            sex_text = user_info.get('sex_text')
+            if _is_known(sex_text):
+                parts.append(f"⚧️ 性别: {sex_text}\n")
+            sex_o_text = user_info.get('sex_o_text')
+            if _is_known(sex_o_text):
+                parts.append(f"💝 性取向: {sex_o_text}\n")
+            sex_p_text = user_info.get('sex_p_text')
+            if _is_known(sex_p_text):
+                parts.append(f"🎭 角色: {sex_p_text}\n")
                 
             # 身高体重
-            if user_info.get('height'):
-                post_text += f"📏 身高: {user_info['height']}cm\n"
-            if user_info.get('weight'):
-                post_text += f"⚖️ 体重: {user_info['weight']}kg\n"
+            height = user_info.get('height')
+            if height:
+                parts.append(f"📏 身高: {height}cm\n")
+            weight = user_info.get('weight')
+            if weight:
+                parts.append(f"⚖️ 体重: {weight}kg\n")
             
             # 地区
-            if user_info.get('country'):
-                post_text += f"📍 地区: {user_info['country']}\n"
+            country = user_info.get('country')
+            if country:
+                parts.append(f"📍 地区: {country}\n")
             
             # 最后在线时间
-            if user_info.get('last_time'):
-                post_text += f"⏰ 最后在线: {user_info['last_time']}\n"
+            last_time = user_info.get('last_time')
+            if last_time:
+                parts.append(f"⏰ 最后在线: {last_time}\n")
             
-            post_text += f"🔗 用户链接: {user_info.get('user_url', '')}\n"
-            post_text += f"📅 搜索时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
-            post_text += f"{'='*60}\n"
+            parts.append(f"🔗 用户链接: {user_info.get('user_url', '')}\n")
+            parts.append(f"📅 搜索时间: {now_str}\n")
+            parts.append(f"{'='*60}\n")
             
             # 添加完整JSON注释数据（像关注查询一样）
-            post_text += f"\n📝 带中文注释的完整JSON数据:\n"
-            post_text += "-" * 60 + "\n"
+            parts.append(f"\n📝 带中文注释的完整JSON数据:\n")
+            parts.append("-" * 60 + "\n")
             
-            # 重新获取完整的用户原始数据（包含所有字段）
+            # 完整的用户原始数据（包含所有字段）：优先复用获取用户信息时的接口响应
             try:
-                r = requests.post(
-                    f"{self.base_url}/api.php/user/show",
-                    headers=self.headers,
-                    json={"id": user_id},
-                    timeout=10
-                )
-                data = r.json()
+                data = self._get_user_show_response(user_id)
+                if data is None:
+                    cached = self._get_cached_user_info(user_id)
+                    if cached is not None and cached.get("_placeholder"):
+                        # 刚获取失败的用户不再请求
+                        data = {}
+                    else:
+                        r = self.session.post(
+                            self.user_show_url,
+                            json={"id": user_id},
+                            timeout=USER_INFO_TIMEOUT
+                        )
+                        data = _json_loads(r.content)
                 
                 if data.get("code") == 1 and data.get("data"):
                     user_raw_data = data["data"]
@@ -1192,7 +1799,7 @@ class BDSMForumSpider:
                     # 构建数据结构（像关注查询一样）
                     full_data = {
                         "_query_info": {
-                            "query_time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                            "query_time": now_str,
                             "query_timestamp": int(time.time()),
                             "user_id": user_id,
                             "query_type": "用户信息查询"
@@ -1201,24 +1808,26 @@ class BDSMForumSpider:
                         "api_response": data
                     }
                     
-                    # 生成带注释的JSON文本
-                    formatted_json = self.format_json_with_comments(full_data)
-                    post_text += formatted_json
-                    post_text += f"\n{'='*60}\n"
-                    post_text += f"💾 完整数据保存时间: {time.strftime('%Y-%m-%d %H:%M:%S')}\n"
+                    # 生成带注释的JSON文本（同一份接口响应的渲染结果按用户缓存复用）
+                    formatted_json = self.format_json_with_comments(
+                        full_data, block_cache=self._get_comment_block_cache(user_id)
+                    )
+                    parts.append(formatted_json)
+                    parts.append(f"\n{'='*60}\n")
+                    parts.append(f"💾 完整数据保存时间: {now_str}\n")
                 else:
-                    post_text += f"⚠️  无法获取用户完整JSON数据\n"
-                    post_text += f"{'='*60}\n"
+                    parts.append(f"⚠️  无法获取用户完整JSON数据\n")
+                    parts.append(f"{'='*60}\n")
                     
             except Exception as e:
-                post_text += f"❌ 获取用户完整数据失败: {e}\n"
-                post_text += f"{'='*60}\n"
+                parts.append(f"❌ 获取用户完整数据失败: {e}\n")
+                parts.append(f"{'='*60}\n")
             
-            post_text += f"📁 文件位置: {filepath}\n"
-            post_text += "=" * 60
+            parts.append(f"📁 文件位置: {filepath}\n")
+            parts.append("=" * 60)
             
             with open(filepath, "w", encoding="utf-8") as f:
-                f.write(post_text)
+                f.write("".join(parts))
             
             print(f"✅ 用户信息已保存到: {filepath}")
             return True
@@ -1226,24 +1835,81 @@ class BDSMForumSpider:
             print(f"❌ 保存用户信息失败: {e}")
             return False
 
+    def _get_comment_block_cache(self, user_id):
+        """取该用户的注释JSON渲染缓存（LRU，超出上限淘汰最久未用的用户）"""
+        with self._comment_block_cache_lock:
+            block_cache = self._comment_block_cache.pop(user_id, None)
+            if block_cache is None:
+                block_cache = {}
+            self._comment_block_cache[user_id] = block_cache
+            if len(self._comment_block_cache) > COMMENT_BLOCK_CACHE_SIZE:
+                self._comment_block_cache.popitem(last=False)
+            return block_cache
+
+    def save_users_to_search_dir(self, users, threads=8):
+        """多线程保存多个用户信息到搜索目录，返回保存成功的数量"""
+        if not users:
+            return 0
+        now_str = _now_str()  # 整批共用一个时间，不必每个用户都格式化
+        with ThreadPoolExecutor(max_workers=max(1, min(threads, len(users)))) as executor:
+            results = executor.map(lambda user: self.save_user_info_to_search_dir(user, now_str), users)
+            return sum(1 for ok in results if ok)
+
     # ---------- 帖子相关功能 ----------
-    def get_posts(self, page=None, limit=20, keyword=""):
-        payload = self.payload_template.copy()
-        payload["page"] = page if page else self.current_page
+    def _post_with_retry(self, url, tries=HTTP_RETRY_TRIES, base_delay=HTTP_RETRY_BASE_DELAY, **kwargs):
+        """
+        session.post，遇到网络异常、429 或 5xx 时指数退避后重试（429 优先按 Retry-After 等待）
+        返回最后一次的响应；最后一次仍是网络异常时抛出
+        """
+        for attempt in range(tries):
+            delay = base_delay * 2 ** attempt + random.random() * 0.1
+            try:
+                r = self.session.post(url, **kwargs)
+                status = r.status_code
+                if (status < 500 and status != 429) or attempt == tries - 1:
+                    return r
+                if status == 429:
+                    retry_after = r.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = min(int(retry_after), HTTP_RETRY_AFTER_MAX)
+            except requests.RequestException:
+                if attempt == tries - 1:
+                    raise
+            time.sleep(delay)
+
+    def _post(self, path, payload, timeout=30):
+        """
+        统一的 POST 请求：检查状态码、解析 JSON、校验 code == 1
+        payload 为 bytes 时视为已序列化的请求体直接发送
+        返回 (True, 完整响应数据) 或 (False, 错误信息)
+        """
         try:
-            r = requests.post(f"{self.base_url}/api.php/circle/list",
-                              headers=self.headers, json=payload, timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("code") == 1:
-                    posts = data.get("data", {}).get("data", [])
-                    info = data.get("data", {})
-                    self.has_more = len(posts) >= info.get("per_page", len(posts))
-                    return {"success": True, "page": self.current_page, "data": posts, "raw_data": data}
-                return {"success": False, "error": data.get("msg", "未知错误")}
-            return {"success": False, "error": f"HTTP {r.status_code}"}
+            url = self.base_url + path
+            if isinstance(payload, bytes):
+                r = self._post_with_retry(url, data=payload, timeout=timeout)
+            else:
+                r = self._post_with_retry(url, json=payload, timeout=timeout)
+            if r.status_code != 200:
+                return False, f"HTTP {r.status_code}"
+            data = _json_loads(r.content)
+            if data.get("code") == 1:
+                return True, data
+            return False, data.get("msg", "未知错误")
         except Exception as e:
-            return {"success": False, "error": str(e)}
+            return False, str(e)
+
+    def get_posts(self, page=None, limit=20, keyword=""):
+        body = b'{"page":%d,%s' % (int(page if page else self.current_page), _POSTS_BODY_TAIL)
+        self.posts_limiter.acquire()
+        ok, data = self._post("/api.php/circle/list", body)
+        if not ok:
+            return {"success": False, "error": data}
+        info = data.get("data")
+        if not isinstance(info, dict):
+            info = {}
+        posts = info.get("data", [])
+        self.has_more = len(posts) >= info.get("per_page", len(posts))
+        return {"success": True, "page": self.current_page, "data": posts, "raw_data": data}
 
     def get_next_page(self):
         if not self.has_more:
@@ -1259,107 +1925,127 @@ class BDSMForumSpider:
         self.has_more = True
 
     def get_post_detail(self, post_id: int) -> Optional[Dict]:
-        try:
-            r = requests.post(f"{self.base_url}/api.php/circle/show",
-                              headers=self.headers, json={"id": post_id}, timeout=10)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("code") == 1 and data.get("data"):
-                    post_data = data["data"]
-                    
-                    # 确保有user字段
-                    user_id = post_data.get("user_id")
-                    if user_id:
-                        # 获取完整用户信息
-                        user_info = self.get_complete_user_info(user_id)
-                        if user_info:
-                            post_data["user"] = {
-                                "id": user_id,
-                                "user_name": user_info["name"],
-                                "nick_name": user_info.get("nick_name", ""),
-                                "age": user_info["age"],
-                                "birthday": user_info["birthday"],
-                                "sex_text": user_info["sex_text"],
-                                "sex_o_text": user_info["sex_o_text"],
-                                "sex_p_text": user_info["sex_p_text"],
-                                "country": user_info["country"],
-                                "country_pic": user_info.get("country_pic", ""),
-                                "height": user_info.get("height", ""),
-                                "weight": user_info.get("weight", ""),
-                                "last_time": user_info.get("last_time", ""),
-                                "intro": user_info.get("intro", ""),
-                                "pic": user_info.get("country_pic", "")
-                            }
-                        else:
-                            post_data["user"] = {
-                                "id": user_id,
-                                "user_name": f"用户_{user_id}"
-                            }
-                    
-                    return post_data
-        except:
-            pass
-        return None
+        ok, data = self._post("/api.php/circle/show", {"id": post_id}, timeout=10)
+        post_data = data.get("data") if ok else None
+        if not isinstance(post_data, dict) or not post_data:
+            return None
+        
+        # 确保有user字段
+        user_id = post_data.get("user_id")
+        if user_id:
+            # 获取完整用户信息
+            user_info = self.get_complete_user_info(user_id)
+            if user_info:
+                post_data["user"] = {
+                    "id": user_id,
+                    "user_name": user_info["name"],
+                    "nick_name": user_info.get("nick_name", ""),
+                    "age": user_info["age"],
+                    "birthday": user_info["birthday"],
+                    "sex_text": user_info["sex_text"],
+                    "sex_o_text": user_info["sex_o_text"],
+                    "sex_p_text": user_info["sex_p_text"],
+                    "country": user_info["country"],
+                    "country_pic": user_info.get("country_pic", ""),
+                    "height": user_info.get("height", ""),
+                    "weight": user_info.get("weight", ""),
+                    "last_time": user_info.get("last_time", ""),
+                    "intro": user_info.get("intro", ""),
+                    "pic": user_info.get("country_pic", "")
+                }
+            else:
+                post_data["user"] = {
+                    "id": user_id,
+                    "user_name": f"用户_{user_id}"
+                }
+        
+        return post_data
 
     def search_posts_with_page(self, keyword, page=1):
         """带页码的搜索方法"""
-        import copy
-        payload = copy.deepcopy(self.payload_template)
-        payload["kw"] = keyword
-        payload["page"] = page
-        payload["order"] = {"create_time": "desc"}  # 明确设置为从新到旧
+        # 只替换顶层字段，嵌套结构不会被修改，浅拷贝即可
+        payload = {
+            **POSTS_PAYLOAD_TEMPLATE,
+            "kw": keyword,
+            "page": page,
+            "order": {"create_time": "desc"},  # 明确设置为从新到旧
+        }
 
-        try:
-            r = requests.post(f"{self.base_url}/api.php/circle/list",
-                              headers=self.headers, json=payload, timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("code") == 1:
-                    raw_data = data.get("data", {})
-                    # 防止 data["data"] 返回列表而非字典
-                    if isinstance(raw_data, dict):
-                        posts = raw_data.get("data", [])
-                    elif isinstance(raw_data, list):
-                        posts = raw_data
-                    else:
-                        posts = []
-                    return {"success": True, "page": page, "data": posts, "raw_data": data}
-                return {"success": False, "error": data.get("msg", "未知错误")}
-            return {"success": False, "error": f"HTTP {r.status_code}"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+        self.posts_limiter.acquire()
+        ok, data = self._post("/api.php/circle/list", payload)
+        if not ok:
+            return {"success": False, "error": data}
+        raw_data = data.get("data", {})
+        # 防止 data["data"] 返回列表而非字典
+        if isinstance(raw_data, dict):
+            posts = raw_data.get("data", [])
+        elif isinstance(raw_data, list):
+            posts = raw_data
+        else:
+            posts = []
+        return {"success": True, "page": page, "data": posts, "raw_data": data}
 
     def get_user_posts(self, user_id: int, page: int = 1):
         payload = {
             "page": page, "order": {"create_time": "desc"}, "kw": "",
-            "append": self.payload_template["append"],
+            "append": POSTS_PAYLOAD_TEMPLATE["append"],
             "with_count": ["comments", "favos", "digs"],
             "user_id": user_id
         }
+        self.posts_limiter.acquire()
+        ok, data = self._post("/api.php/circle/list", payload)
+        if not ok:
+            return {"success": False, "error": data}
+        info = data.get("data")
+        if not isinstance(info, dict):
+            info = {}
+        posts = info.get("data", [])
+        per_page = info.get("per_page", 20)
+        return {
+            "success": True, 
+            "page": page, 
+            "data": posts, 
+            "total": info.get("total", 0),
+            "per_page": per_page,
+            "has_more": len(posts) >= per_page,
+            "raw_data": data
+        }
+
+    def _iter_pages_prefetched(self, fetch_page, max_pages: int, prefetch: int = 2):
+        """
+        按页码顺序产出 (页码, fetch_page(页码))，后台提前获取后续页面
+        prefetch: 同时在途的页数（默认只多取一页，结果只有一页时最多浪费一次请求）；
+                  调用方提前 break 时未完成的预取会被取消
+        """
+        executor = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        pending = deque()
+        next_page = 1
         try:
-            r = requests.post(f"{self.base_url}/api.php/circle/list",
-                              headers=self.headers, json=payload, timeout=30)
-            if r.status_code == 200:
-                data = r.json()
-                if data.get("code") == 1:
-                    posts = data.get("data", {}).get("data", [])
-                    total_posts = data.get("data", {}).get("total", 0)
-                    per_page = data.get("data", {}).get("per_page", 20)
-                    has_more = len(posts) >= per_page
-                    
-                    return {
-                        "success": True, 
-                        "page": page, 
-                        "data": posts, 
-                        "total": total_posts,
-                        "per_page": per_page,
-                        "has_more": has_more,
-                        "raw_data": data
-                    }
-                return {"success": False, "error": data.get("msg", "未知错误")}
-            return {"success": False, "error": f"HTTP {r.status_code}"}
-        except Exception as e:
-            return {"success": False, "error": str(e)}
+            while next_page <= max_pages and len(pending) < prefetch:
+                pending.append((next_page, executor.submit(fetch_page, next_page)))
+                next_page += 1
+            
+            while pending:
+                page, future = pending.popleft()
+                result = future.result()
+                if next_page <= max_pages:
+                    pending.append((next_page, executor.submit(fetch_page, next_page)))
+                    next_page += 1
+                yield page, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    def iter_user_post_pages(self, user_id: int, max_pages: int, prefetch: int = 2):
+        """按页码顺序产出用户帖子 (页码, 结果)，后台预取后续页面"""
+        return self._iter_pages_prefetched(
+            lambda page: self.get_user_posts(user_id, page), max_pages, prefetch)
+
+    def iter_search_pages(self, keyword, max_pages: int, prefetch: int = 2):
+        """按页码顺序产出关键词搜索 (页码, 结果)，后台预取后续页面"""
+        return self._iter_pages_prefetched(
+            lambda page: self.search_posts_with_page(keyword, page), max_pages, prefetch)
 
     def crawl_user_posts(self, user_id: int):
         """爬取用户全部帖子"""
@@ -1384,16 +2070,15 @@ class BDSMForumSpider:
             print(f"⚠️  输入无效，使用默认页数: {max_pages}")
         
         all_posts = []
-        page = 1
         total_saved = 0
         actual_pages_crawled = 0
         
         print(f"\n📥 开始获取用户 {user_id} 的帖子...")
         print(f"📄 计划爬取: {max_pages} 页")
         
-        while page <= max_pages:
+        # 用户浏览、选择保存当前页时，后台预取下一页
+        for page, result in self.iter_user_post_pages(user_id, max_pages):
             print(f"\n📄 正在获取第 {page}/{max_pages} 页...")
-            result = self.get_user_posts(user_id, page)
             
             if not result["success"]:
                 print(f"❌ 第 {page} 页获取失败: {result.get('error', '未知错误')}")
@@ -1428,7 +2113,6 @@ class BDSMForumSpider:
                         if self.save_post_for_user_crawl(post, user_info, manual_mode=False, index=i):
                             page_saved += 1
                             total_saved += 1
-                        time.sleep(0.5)
                     print(f"✅ 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
                     
                 elif save_choice == 's':
@@ -1444,7 +2128,6 @@ class BDSMForumSpider:
                                     if self.save_post_for_user_crawl(posts[idx], user_info, manual_mode=True):
                                         page_saved += 1
                                         total_saved += 1
-                                    time.sleep(0.5)
                             print(f"✅ 第 {page} 页保存了 {page_saved}/{len(indices)} 个帖子")
                         except:
                             print("❌ 输入格式错误")
@@ -1456,16 +2139,13 @@ class BDSMForumSpider:
             if not result.get("has_more", False):
                 print("📭 最后一页，停止爬取")
                 break
-                
-            page += 1
             
             # 如果不是最后一页，询问是否继续下一页
-            if page <= max_pages:
-                continue_choice = input(f"\n是否继续爬取第 {page} 页？(y/n): ").strip().lower()
+            if page < max_pages:
+                continue_choice = input(f"\n是否继续爬取第 {page + 1} 页？(y/n): ").strip().lower()
                 if continue_choice != 'y':
                     print("⏹️  停止爬取")
                     break
-                time.sleep(1)
         
         # 统计总结果
         if all_posts:
@@ -1498,8 +2178,7 @@ class BDSMForumSpider:
         self.display_post_for_browsing(detail, index=1)  # 单个帖子显示为序号1
         
         # 获取用户信息
-        user_info = detail.get("user", {})
-        user_id = user_info.get("id") or detail.get("user_id")
+        user_id = _extract_user_id(detail)
         
         # 保存帖子
         save_choice = input("是否保存此帖子？(y/n): ").strip().lower()
@@ -1531,7 +2210,7 @@ class BDSMForumSpider:
             elif isinstance(user_info, list):
                 user_info = user_info[0] if user_info else {}
 
-            user_id = user_info.get("id") if isinstance(user_info, dict) else None
+            user_id = user_info.get("id") if isinstance(user_info, (dict, UserInfo)) else None
             if not user_id:
                 user_id = post_data.get("user_id")
 
@@ -1540,57 +2219,50 @@ class BDSMForumSpider:
                 return False
 
             username = ""
-            if isinstance(user_info, dict):
-                username = user_info.get("user_name") or user_info.get("name") or f"用户_{user_id}"
+            if isinstance(user_info, (dict, UserInfo)):
+                username = _user_display_name(user_info, user_id)
             else:
                 username = f"用户_{user_id}"
             
             # 使用用户名而不是"用户_ID"
-            safe_name = INVALID_CHARS.sub("_", username)[:20] if username else f"用户_{user_id}"
+            safe_name = username[:20].translate(INVALID_CHARS_TABLE) if username else f"用户_{user_id}"
             filename = f"{user_id}_{safe_name}.txt"
             filepath = os.path.join(self.users_dir, filename)
             
-            file_exists = os.path.exists(filepath)
-            
-            # 如果是新文件，写入完整的用户档案
-            if not file_exists:
-                # 生成完整的用户档案文本
-                archive_text = self.format_user_archive_text(user_info)
-                
-                with open(filepath, "w", encoding="utf-8") as f:
-                    f.write(archive_text)
-            
             # 添加帖子内容
             # 修复：安全获取内容（优先使用content，没有则使用title）
             content = post_data.get("content") or post_data.get("title") or "无内容"
-            create_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(post_data.get("create_time", 0)))
+            create_time = _fmt_ts(post_data.get("create_time", 0))
             
-            post_text = f"\n【帖子 #{post_id}】\n"
+            parts = [f"\n{POST_MARKER}{post_id}】\n"]
             if index is not None:
-                post_text += f"序号: [{index}]\n"
-            post_text += f"内容: {content}\n"
-            post_text += f"发布时间: {create_time}\n"
-            post_text += f"浏览量: {post_data.get('onclick', 0)}\n"
-            post_text += f"点赞数: {post_data.get('dig_count', 0)}\n"
-            post_text += f"评论数: {post_data.get('com_count', 0)}\n"
+                parts.append(f"序号: [{index}]\n")
+            parts.append(f"内容: {content}\n")
+            parts.append(f"发布时间: {create_time}\n")
+            parts.append(f"浏览量: {post_data.get('onclick', 0)}\n")
+            parts.append(f"点赞数: {post_data.get('dig_count', 0)}\n")
+            parts.append(f"评论数: {post_data.get('com_count', 0)}\n")
             
             # 安全处理files字段
             files = post_data.get("files")
             if isinstance(files, list) and files:
-                post_text += f"图片数量: {len(files)}\n"
-                post_text += "图片链接:\n"
-                for i, f in enumerate(files, 1):
-                    if isinstance(f, dict):
-                        post_text += f"{i}. {f.get('url', '')}\n"
+                parts.append(f"图片数量: {len(files)}\n")
+                parts.append("图片链接:\n")
+                for i, file_item in enumerate(files, 1):
+                    if isinstance(file_item, dict):
+                        parts.append(f"{i}. {file_item.get('url', '')}\n")
                     else:
-                        post_text += f"{i}. {f}\n"
+                        parts.append(f"{i}. {file_item}\n")
             else:
-                post_text += f"图片数量: 0\n"
+                parts.append(f"图片数量: 0\n")
             
-            post_text += f"{'-'*40}\n"
+            parts.append(f"{'-'*40}\n")
             
+            # 只打开一次文件：新文件（或空文件）先写入完整的用户档案，再追加帖子
             with open(filepath, "a", encoding="utf-8") as f:
-                f.write(post_text)
+                if f.tell() == 0:
+                    parts.insert(0, self.format_user_archive_text(user_info))
+                f.write("".join(parts))
             
             if manual_mode:
                 if index is not None:
@@ -1606,50 +2278,70 @@ class BDSMForumSpider:
             return True
         except Exception as e:
             print(f"❌ 保存帖子失败: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            if DEBUG:
+                traceback.print_exc()
             return False
 
+    def warm_up_connection(self):
+        """后台先向站点发一个 HEAD 请求，提前完成 TCP/TLS 握手，连接留在会话连接池中供后续请求复用"""
+        def _warm():
+            try:
+                self.session.head(self.base_url, timeout=5)
+            except requests.RequestException:
+                pass
+        threading.Thread(target=_warm, daemon=True).start()
+
+    def close(self):
+        """退出前释放资源：等待后台写入完成，关闭缓存数据库和会话连接"""
+        self._attention_writer.shutdown(wait=True)
+        if self.user_store is not None:
+            self.user_store.close()
+            self.user_store = None
+        self.session.close()
+
     def extract_post_info(self, post_data: Dict) -> Dict:
-        post_id = post_data.get("id")
-        user_info = post_data.get("user", {})
-        user_id = user_info.get("id") or post_data.get("user_id")
+        get = post_data.get
+        post_id = get("id")
+        user_info = get("user")
+        if not isinstance(user_info, dict):
+            user_info = {}
+        user_id = user_info.get("id") or get("user_id")
         
         # 获取完整用户信息
         complete_user_info = None
         if user_id:
             complete_user_info = self.get_complete_user_info(user_id)
         
-        # 使用完整用户信息或基本用户信息
+        # 使用完整用户信息或基本用户信息（.get 绑定到局部变量，逐字段取值时不再重复查找方法）
         user_data = complete_user_info if complete_user_info else user_info
+        user_get = user_data.get
         
         info = {
             "帖子ID": post_id,
-            "内容": post_data.get("title"),
-            "发布时间": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(post_data.get("create_time", 0))),
-            "浏览量": post_data.get("onclick", 0),
-            "点赞数": post_data.get("dig_count", 0),
-            "评论数": post_data.get("com_count", 0),
-            "来源": post_data.get("source", "API")
-        }
-        
-        info["用户"] = {
-            "用户ID": user_id,
-            "用户名": user_data.get("user_name") or user_data.get("name") or f"用户_{user_id}",
-            "昵称": user_data.get("nick_name", ""),
-            "年龄": user_data.get("age", ""),
-            "生日": user_data.get("birthday", ""),
-            "性别": user_data.get("sex_text", ""),
-            "性取向": user_data.get("sex_o_text", ""),
-            "角色": user_data.get("sex_p_text", ""),
-            "地区": user_data.get("country", ""),
-            "身高": user_data.get("height", ""),
-            "体重": user_data.get("weight", ""),
-            "最后在线": user_data.get("last_time", ""),
-            "个人简介": user_data.get("intro", "")
+            "内容": get("title"),
+            "发布时间": _fmt_ts(get("create_time", 0)),
+            "浏览量": get("onclick", 0),
+            "点赞数": get("dig_count", 0),
+            "评论数": get("com_count", 0),
+            "来源": get("source", "API"),
+            "用户": {
+                "用户ID": user_id,
+                "用户名": _user_display_name(user_data, user_id),
+                "昵称": user_get("nick_name", ""),
+                "年龄": user_get("age", ""),
+                "生日": user_get("birthday", ""),
+                "性别": user_get("sex_text", ""),
+                "性取向": user_get("sex_o_text", ""),
+                "角色": user_get("sex_p_text", ""),
+                "地区": user_get("country", ""),
+                "身高": user_get("height", ""),
+                "体重": user_get("weight", ""),
+                "最后在线": user_get("last_time", ""),
+                "个人简介": user_get("intro", "")
+            }
         }
         
-        files = post_data.get("files", [])
+        files = get("files", [])
         if files:
             info["图片数量"] = len(files)
         return info
@@ -1659,8 +2351,9 @@ class BDSMForumSpider:
             print("❌ 还没有保存任何文件")
             return
         
-        # 获取所有txt文件
-        all_files = [f for f in os.listdir(self.users_dir) if f.endswith('.txt')]
+        # 获取所有txt文件（scandir 一次拿到文件名和大小）
+        with os.scandir(self.users_dir) as it:
+            all_files = [entry for entry in it if entry.name.endswith('.txt') and entry.is_file()]
         
         if not all_files:
             print("❌ 帖子目录为空")
@@ -1669,14 +2362,11 @@ class BDSMForumSpider:
         print(f"\n📁 帖子文件 ({len(all_files)} 个):")
         print("=" * 50)
         
-        for filename in sorted(all_files):
-            filepath = os.path.join(self.users_dir, filename)
-            size = os.path.getsize(filepath)
+        for entry in sorted(all_files, key=lambda e: e.name):
+            filename = entry.name
+            size = entry.stat().st_size
             user_id = filename.split('_')[0] if '_' in filename else filename.replace('.txt', '')
-            
-            with open(filepath, encoding='utf-8') as f:
-                content = f.read()
-                post_cnt = content.count("【帖子 #")
+            post_cnt = _count_marker_in_file(entry.path)
             
             print(f"📄 {filename} ({size/1024:.1f} KB) | 🆔 {user_id} | 📝 {post_cnt} 帖")
         print("=" * 50)
@@ -1705,6 +2395,7 @@ class BDSMForumSpider:
             
             print(f"✅ 获取到 {len(posts)} 个帖子")
             total_viewed += len(posts)
+            self.prefetch_user_infos(posts)
             
             for i, post in enumerate(posts, 1):
                 # 使用统一的显示函数
@@ -1725,8 +2416,7 @@ class BDSMForumSpider:
                     return
                 elif save_choice == 'y':
                     # 获取完整用户信息
-                    user_info = post.get("user", {})
-                    user_id = user_info.get('id') or post.get('user_id')
+                    user_id = _extract_user_id(post)
                     if user_id:
                         complete_user_info = self.get_complete_user_info(user_id)
                         if complete_user_info:
@@ -1782,129 +2472,132 @@ class BDSMForumSpider:
             print("⚠️  输入无效，使用默认1页")
         
         # 创建结果保存器
-        saver = ResultSaver(self.search_dir, f"帖子搜索_{keyword}", f"第1页", f"第{max_pages}页")
+        with ResultSaver(self.search_dir, f"帖子搜索_{keyword}", f"第1页", f"第{max_pages}页") as saver:
         
-        all_posts = []
-        total_saved = 0
-        start_time = time.time()
+            all_posts = []
+            total_saved = 0
+            start_time = time.time()
         
-        for page in range(1, max_pages + 1):
-            print(f"\n📄 正在搜索第 {page} 页...")
-            result = self.search_posts_with_page(keyword, page)
+            for page in range(1, max_pages + 1):
+                print(f"\n📄 正在搜索第 {page} 页...")
+                result = self.search_posts_with_page(keyword, page)
             
-            if not result or not result.get("success"):
-                print(f"❌ 第 {page} 页搜索失败: {result.get('error', '未知错误')}")
-                saver.save_record(f"第{page}页", "❌", f"搜索失败: {result.get('error', '未知错误')}")
-                break
-                
-            posts = result.get("data", [])
-            if not posts:
-                print(f"📭 第 {page} 页没有找到相关帖子")
-                saver.save_record(f"第{page}页", "📭", "没有找到相关帖子")
-                if page == 1:
-                    break
-                else:
+                if not result or not result.get("success"):
+                    error_msg = result.get('error', '未知错误') if result else '请求失败'
+                    print(f"❌ 第 {page} 页搜索失败: {error_msg}")
+                    saver.save_record(f"第{page}页", "❌", f"搜索失败: {error_msg}")
                     break
+                
+                posts = result.get("data", [])
+                if not posts:
+                    print(f"📭 第 {page} 页没有找到相关帖子")
+                    saver.save_record(f"第{page}页", "📭", "没有找到相关帖子")
+                    if page == 1:
+                        break
+                    else:
+                        break
             
-            print(f"✅ 第 {page} 页找到 {len(posts)} 个相关帖子")
-            saver.save_record(f"第{page}页", "✅", f"找到{len(posts)}个帖子")
-            all_posts.extend(posts)
+                print(f"✅ 第 {page} 页找到 {len(posts)} 个相关帖子")
+                saver.save_record(f"第{page}页", "✅", f"找到{len(posts)}个帖子")
+                all_posts.extend(posts)
             
-            # 显示当前页的帖子
-            print(f"\n📋 第 {page} 页搜索结果:")
-            print("=" * 50)
+                # 显示当前页的帖子
+                print(f"\n📋 第 {page} 页搜索结果:")
+                print("=" * 50)
+                self.prefetch_user_infos(posts)
             
-            for i, post in enumerate(posts, 1):
-                # 使用统一的显示函数
-                self.display_post_for_browsing(post, index=i)
+                for i, post in enumerate(posts, 1):
+                    # 使用统一的显示函数
+                    self.display_post_for_browsing(post, index=i)
             
-            # 保存当前页的帖子
-            if posts:
-                print("\n" + "=" * 50)
-                save_choice = input(f"是否保存第 {page} 页的所有搜索结果？(y/n/s=选择保存): ").strip().lower()
+                # 保存当前页的帖子
+                if posts:
+                    print("\n" + "=" * 50)
+                    save_choice = input(f"是否保存第 {page} 页的所有搜索结果？(y/n/s=选择保存): ").strip().lower()
                 
-                if save_choice == 'y':
-                    page_saved = 0
-                    for post in posts:
-                        # 获取用户信息
-                        user_info = post.get("user", {})
-                        user_id = user_info.get("id") or post.get("user_id")
-                        if user_id:
-                            # 获取完整用户信息
-                            complete_user_info = self.get_complete_user_info(user_id)
-                            if complete_user_info:
-                                if self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False):
-                                    page_saved += 1
-                                    saver.save_record(f"帖子{post.get('id')}", "✅", "自动保存")
+                    if save_choice == 'y':
+                        page_saved = 0
+                        for post in posts:
+                            # 获取用户信息
+                            user_id = _extract_user_id(post)
+                            if user_id:
+                                # 获取完整用户信息
+                                complete_user_info = self.get_complete_user_info(user_id)
+                                if complete_user_info:
+                                    if self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False):
+                                        page_saved += 1
+                                        saver.save_record(f"帖子{post.get('id')}", "✅", "自动保存")
+                                    else:
+                                        saver.save_record(f"帖子{post.get('id')}", "❌", "保存失败")
                                 else:
-                                    saver.save_record(f"帖子{post.get('id')}", "❌", "保存失败")
-                            else:
-                                saver.save_record(f"帖子{post.get('id')}", "❌", "无法获取用户信息")
-                        time.sleep(0.3)
-                    total_saved += page_saved
-                    print(f"✅ 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
-                    saver.save_record(f"第{page}页", "📊", f"保存{page_saved}/{len(posts)}个帖子")
+                                    saver.save_record(f"帖子{post.get('id')}", "❌", "无法获取用户信息")
+                            self.save_limiter.acquire()
+                        total_saved += page_saved
+                        print(f"✅ 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
+                        saver.save_record(f"第{page}页", "📊", f"保存{page_saved}/{len(posts)}个帖子")
                 
-                elif save_choice == 's':
-                    print("\n🔍 请选择要保存的帖子:")
-                    selected = input(f"输入第 {page} 页的帖子编号（用逗号分隔，如 1,3,5）: ").strip()
+                    elif save_choice == 's':
+                        print("\n🔍 请选择要保存的帖子:")
+                        selected = input(f"输入第 {page} 页的帖子编号（用逗号分隔，如 1,3,5）: ").strip()
                     
-                    if selected:
-                        try:
-                            indices = [int(idx.strip()) - 1 for idx in selected.split(',') if idx.strip().isdigit()]
-                            page_saved = 0
-                            for idx in indices:
-                                if 0 <= idx < len(posts):
-                                    # 获取用户信息
-                                    user_info = posts[idx].get("user", {})
-                                    user_id = user_info.get("id") or posts[idx].get("user_id")
-                                    if user_id:
-                                        complete_user_info = self.get_complete_user_info(user_id)
-                                        if complete_user_info:
-                                            if self.save_post_for_user_crawl(posts[idx], complete_user_info, manual_mode=True):
-                                                page_saved += 1
-                                                saver.save_record(f"帖子{posts[idx].get('id')}", "✅", "手动选择保存")
-                                            else:
-                                                saver.save_record(f"帖子{posts[idx].get('id')}", "❌", "保存失败")
-                                    time.sleep(0.5)
-                            total_saved += page_saved
-                            print(f"✅ 第 {page} 页保存了 {page_saved}/{len(indices)} 个帖子")
-                            saver.save_record(f"第{page}页", "📊", f"手动选择保存{page_saved}/{len(indices)}个帖子")
-                        except:
-                            print("❌ 输入格式错误")
-                            saver.save_record(f"第{page}页", "❌", "输入格式错误")
+                        if selected:
+                            try:
+                                indices = [int(idx.strip()) - 1 for idx in selected.split(',') if idx.strip().isdigit()]
+                                page_saved = 0
+                                for idx in indices:
+                                    if 0 <= idx < len(posts):
+                                        # 获取用户信息
+                                        user_id = _extract_user_id(posts[idx])
+                                        if user_id:
+                                            complete_user_info = self.get_complete_user_info(user_id)
+                                            if complete_user_info:
+                                                if self.save_post_for_user_crawl(posts[idx], complete_user_info, manual_mode=True):
+                                                    page_saved += 1
+                                                    saver.save_record(f"帖子{posts[idx].get('id')}", "✅", "手动选择保存")
+                                                else:
+                                                    saver.save_record(f"帖子{posts[idx].get('id')}", "❌", "保存失败")
+                                        self.save_limiter.acquire()
+                                total_saved += page_saved
+                                print(f"✅ 第 {page} 页保存了 {page_saved}/{len(indices)} 个帖子")
+                                saver.save_record(f"第{page}页", "📊", f"手动选择保存{page_saved}/{len(indices)}个帖子")
+                            except:
+                                print("❌ 输入格式错误")
+                                saver.save_record(f"第{page}页", "❌", "输入格式错误")
                 
-                # 如果不是最后一页，询问是否继续下一页
-                if page < max_pages:
-                    continue_choice = input(f"\n是否继续搜索第 {page+1} 页？(y/n): ").strip().lower()
-                    if continue_choice != 'y':
-                        print("⏹️  停止搜索")
-                        break
-            else:
-                saver.save_record(f"第{page}页", "📭", "本页无帖子可保存")
+                    # 本页记录先落盘，再等待用户输入
+                    saver.flush()
+                
+                    # 如果不是最后一页，询问是否继续下一页
+                    if page < max_pages:
+                        continue_choice = input(f"\n是否继续搜索第 {page+1} 页？(y/n): ").strip().lower()
+                        if continue_choice != 'y':
+                            print("⏹️  停止搜索")
+                            break
+                else:
+                    saver.save_record(f"第{page}页", "📭", "本页无帖子可保存")
         
-        # 统计总结果
-        elapsed = time.time() - start_time
-        print(f"\n" + "=" * 50)
-        print("🔍 搜索完成！")
-        print("=" * 50)
-        print(f"📊 统计:")
-        print(f"  总搜索页数: {min(page, max_pages)}/{max_pages}")
-        print(f"  找到帖子总数: {len(all_posts)}")
-        print(f"  保存帖子总数: {total_saved}")
-        if all_posts:
-            save_rate = (total_saved / len(all_posts)) * 100
-            print(f"  保存率: {save_rate:.1f}%")
+            # 统计总结果
+            elapsed = time.time() - start_time
+            print(f"\n" + "=" * 50)
+            print("🔍 搜索完成！")
+            print("=" * 50)
+            print(f"📊 统计:")
+            print(f"  总搜索页数: {min(page, max_pages)}/{max_pages}")
+            print(f"  找到帖子总数: {len(all_posts)}")
+            print(f"  保存帖子总数: {total_saved}")
+            if all_posts:
+                save_rate = (total_saved / len(all_posts)) * 100
+                print(f"  保存率: {save_rate:.1f}%")
         
-        extra_stats = {
-            "搜索关键词": keyword,
-            "实际搜索页数": f"{min(page, max_pages)}/{max_pages}",
-            "找到帖子数": len(all_posts),
-            "保存帖子数": total_saved,
-            "保存率": f"{save_rate:.1f}%" if all_posts else "0%"
-        }
-        saver.finalize(total_saved, len(all_posts)-total_saved, len(all_posts), elapsed, extra_stats)
-        print(f"📋 搜索记录已保存: {saver.filepath}")
+            extra_stats = {
+                "搜索关键词": keyword,
+                "实际搜索页数": f"{min(page, max_pages)}/{max_pages}",
+                "找到帖子数": len(all_posts),
+                "保存帖子数": total_saved,
+                "保存率": f"{save_rate:.1f}%" if all_posts else "0%"
+            }
+            saver.finalize(total_saved, len(all_posts)-total_saved, len(all_posts), elapsed, extra_stats)
+            print(f"📋 搜索记录已保存: {saver.filepath}")
 
     def crawl_and_save_posts(self, start_page=1, max_pages=3, threads=8):
         """批量爬取帖子（多线程版本）"""
@@ -1912,137 +2605,156 @@ class BDSMForumSpider:
         print(f"⚡ 使用 {threads} 个线程")
 
         # 创建结果保存器
-        saver = ResultSaver(self.search_dir, f"批量爬取", f"第{start_page}页", f"第{start_page+max_pages-1}页")
-
-        # 线程安全的计数器和结果存储
-        results_lock = threading.Lock()
-        all_posts = []  # 存储所有帖子 (page_num, posts)
-        page_results = {}  # 存储每页结果
-        saved_count = 0
-        total_posts = 0
-        failed_pages = 0
-        start_time = time.time()
+        with ResultSaver(self.search_dir, f"批量爬取", f"第{start_page}页", f"第{start_page+max_pages-1}页") as saver:
 
-        def fetch_page(page_num):
-            """获取单页数据"""
-            nonlocal failed_pages
-            try:
-                result = self.get_posts(page=page_num)
+            # 线程安全的计数器和结果存储
+            results_lock = threading.Lock()
+            all_posts = []  # 存储所有帖子 (page_num, posts)
+            page_results = {}  # 存储每页结果
+            saved_count = 0
+            total_posts = 0
+            failed_pages = 0
+            start_time = time.time()
+
+            def fetch_page(page_num):
+                """获取单页数据"""
+                nonlocal failed_pages
+                try:
+                    result = self.get_posts(page=page_num)
+
+                    if not result["success"]:
+                        with results_lock:
+                            failed_pages += 1
+                            saver.save_record(f"第{page_num}页", "❌", f"获取失败: {result.get('error', '未知错误')}")
+                        print(f"❌ 第 {page_num} 页获取失败: {result.get('error', '未知错误')}")
+                        return None
 
-                if not result["success"]:
+                    posts = result.get("data", [])
+                    if not posts:
+                        with results_lock:
+                            saver.save_record(f"第{page_num}页", "📭", "没有数据")
+                        print(f"📭 第 {page_num} 页没有数据")
+                        return None
+
+                    print(f"✅ 第 {page_num} 页获取到 {len(posts)} 个帖子")
+                    return (page_num, posts)
+                except Exception as e:
                     with results_lock:
                         failed_pages += 1
-                        saver.save_record(f"第{page_num}页", "❌", f"获取失败: {result.get('error', '未知错误')}")
-                    print(f"❌ 第 {page_num} 页获取失败: {result.get('error', '未知错误')}")
+                        saver.save_record(f"第{page_num}页", "❌", f"异常: {e}")
+                    print(f"❌ 第 {page_num} 页异常: {e}")
                     return None
 
-                posts = result.get("data", [])
-                if not posts:
-                    with results_lock:
-                        saver.save_record(f"第{page_num}页", "📭", "没有数据")
-                    print(f"📭 第 {page_num} 页没有数据")
-                    return None
+            # 使用线程池并行获取所有页面
+            print(f"\n📥 正在并行获取第 {start_page} 到 {start_page + max_pages - 1} 页...")
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = {executor.submit(fetch_page, page_num): page_num
+                          for page_num in range(start_page, start_page + max_pages)}
 
-                print(f"✅ 第 {page_num} 页获取到 {len(posts)} 个帖子")
-                return (page_num, posts)
-            except Exception as e:
-                with results_lock:
-                    failed_pages += 1
-                    saver.save_record(f"第{page_num}页", "❌", f"异常: {e}")
-                print(f"❌ 第 {page_num} 页异常: {e}")
-                return None
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                        if result:
+                            page_num, posts = result
+                            with results_lock:
+                                page_results[page_num] = posts
+                                total_posts += len(posts)
+                    except Exception as e:
+                        print(f"⚠️ 任务异常: {e}")
+            saver.flush()
+
+            # 按页码顺序显示结果（从新到旧），并按用户分组待保存的帖子
+            print(f"\n📋 正在处理和保存帖子...")
+            self.prefetch_user_infos((post for posts in page_results.values() for post in posts), threads)
+            user_posts = OrderedDict()  # user_id -> [(页码, 序号, 帖子)]
+            page_range = range(start_page, start_page + max_pages)
+            for page_num in page_range:
+                posts = page_results.get(page_num)
+                if not posts:
+                    continue
 
-        # 使用线程池并行获取所有页面
-        print(f"\n📥 正在并行获取第 {start_page} 到 {start_page + max_pages - 1} 页...")
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            futures = {executor.submit(fetch_page, page_num): page_num
-                      for page_num in range(start_page, start_page + max_pages)}
+                # 显示本页帖子概览（只显示前5个）
+                print(f"\n📄 第 {page_num} 页帖子:")
+                print("-" * 50)
+                for i, post in enumerate(islice(posts, 5), 1):
+                    self.display_post_for_browsing(post, index=i)
+                if len(posts) > 5:
+                    print(f"   ... 还有 {len(posts)-5} 个帖子")
 
-            for future in as_completed(futures):
-                try:
-                    result = future.result()
-                    if result:
-                        page_num, posts = result
-                        with results_lock:
-                            page_results[page_num] = posts
-                            total_posts += len(posts)
-                except Exception as e:
-                    print(f"⚠️ 任务异常: {e}")
+                for i, post in enumerate(posts, 1):
+                    try:
+                        user_id = _extract_user_id(post)
+                    except AttributeError:  # 非字典数据
+                        continue
+                    if user_id:
+                        user_posts.setdefault(user_id, []).append((page_num, i, post))
 
-        # 按页码顺序处理结果（从新到旧）
-        print(f"\n📋 正在处理和保存帖子...")
-        for page_num in sorted(page_results.keys()):
-            posts = page_results[page_num]
+            # 同一用户的帖子由同一个任务按顺序写入同一文件，不同用户之间并行
+            def save_user_posts(user_id, items):
+                saved_pages = []
+                complete_user_info = self.get_complete_user_info(user_id)
+                if complete_user_info:
+                    for page_num, i, post in items:
+                        if self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False, index=i):
+                            saved_pages.append(page_num)
+                return saved_pages
 
-            # 显示本页帖子概览（只显示前5个）
-            print(f"\n📄 第 {page_num} 页帖子:")
-            print("-" * 50)
-            for i, post in enumerate(posts[:5], 1):
-                self.display_post_for_browsing(post, index=i)
-            if len(posts) > 5:
-                print(f"   ... 还有 {len(posts)-5} 个帖子")
+            page_saved = Counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = [executor.submit(save_user_posts, user_id, items)
+                           for user_id, items in user_posts.items()]
+                for future in as_completed(futures):
+                    try:
+                        page_saved.update(future.result())
+                    except Exception as e:
+                        print(f"⚠️ 保存任务异常: {e}")
+            saved_count = sum(page_saved.values())
 
-            # 保存本页帖子
-            page_saved = 0
-            for i, post in enumerate(posts, 1):
-                if not isinstance(post, dict):
+            for page_num in page_range:
+                posts = page_results.get(page_num)
+                if not posts:
                     continue
-                user_info = post.get("user", {})
-                if not isinstance(user_info, dict):
-                    user_info = {}
-                user_id = user_info.get("id") or post.get("user_id")
-                if user_id:
-                    complete_user_info = self.get_complete_user_info(user_id)
-                    if complete_user_info:
-                        success = self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False, index=i)
-                        if success:
-                            page_saved += 1
-                            saved_count += 1
-                time.sleep(0.1)
-
-            print(f"📝 第 {page_num} 页保存了 {page_saved}/{len(posts)} 个帖子")
-            saver.save_record(f"第{page_num}页", "📊", f"保存{page_saved}/{len(posts)}个帖子")
+                print(f"📝 第 {page_num} 页保存了 {page_saved[page_num]}/{len(posts)} 个帖子")
+                saver.save_record(f"第{page_num}页", "📊", f"保存{page_saved[page_num]}/{len(posts)}个帖子")
+
+            elapsed = time.time() - start_time
+            actual_pages = len(page_results)
+
+            print(f"\n🎉 批量爬取完成！")
+            print(f"📊 总计:")
+            print(f"  爬取页数: {actual_pages}/{max_pages}")
+            print(f"  获取帖子: {total_posts}")
+            print(f"  保存帖子: {saved_count}")
+            print(f"  失败页数: {failed_pages}")
+            print(f"  耗时: {elapsed:.1f}秒")
+            print(f"💾 数据保存在: {self.users_dir}/")
 
-        elapsed = time.time() - start_time
-        actual_pages = len(page_results)
-
-        print(f"\n🎉 批量爬取完成！")
-        print(f"📊 总计:")
-        print(f"  爬取页数: {actual_pages}/{max_pages}")
-        print(f"  获取帖子: {total_posts}")
-        print(f"  保存帖子: {saved_count}")
-        print(f"  失败页数: {failed_pages}")
-        print(f"  耗时: {elapsed:.1f}秒")
-        print(f"💾 数据保存在: {self.users_dir}/")
-
-        extra_stats = {
-            "实际爬取页数": f"{actual_pages}/{max_pages}",
-            "获取帖子数": total_posts,
-            "保存帖子数": saved_count,
-            "失败页数": failed_pages,
-            "保存率": f"{(saved_count/total_posts*100):.1f}%" if total_posts > 0 else "0%"
-        }
-        saver.finalize(saved_count, total_posts-saved_count, total_posts, elapsed, extra_stats)
-        print(f"📋 批量爬取记录已保存: {saver.filepath}")
+            extra_stats = {
+                "实际爬取页数": f"{actual_pages}/{max_pages}",
+                "获取帖子数": total_posts,
+                "保存帖子数": saved_count,
+                "失败页数": failed_pages,
+                "保存率": f"{(saved_count/total_posts*100):.1f}%" if total_posts > 0 else "0%"
+            }
+            saver.finalize(saved_count, total_posts-saved_count, total_posts, elapsed, extra_stats)
+            print(f"📋 批量爬取记录已保存: {saver.filepath}")
 
     # ---------- 投票功能 ----------
     def vote_check(self, task_id: int):
-        url = f"{self.base_url}/api.php/play/pds"
         try:
-            r = requests.post(url, headers=self.headers, json={"id": str(task_id)}, timeout=5)
+            r = self._post_with_retry(self.vote_check_url, json={"id": str(task_id)}, timeout=5)
             if r.status_code == 200:
-                data = r.json()
+                data = _json_loads(r.content)
                 return data.get("code") == 1, data.get("msg", ""), data.get("code", 0), data.get("data", "")
             return False, "HTTP 非 200", r.status_code, ""
         except Exception as e:
             return False, f"请求异常: {str(e)}", 0, ""
 
     def vote_do(self, task_id: int):
-        url = f"{self.base_url}/api.php/play/pd_do"
         try:
-            r = requests.post(url, headers=self.headers, json={"id": task_id, "type": 1}, timeout=5)
+            r = self._post_with_retry(self.vote_do_url, json={"id": task_id, "type": 1}, timeout=5)
             if r.status_code == 200:
-                data = r.json()
+                data = _json_loads(r.content)
                 code = data.get("code")
                 msg = data.get("msg", "")
                 
@@ -2060,22 +2772,22 @@ class BDSMForumSpider:
         print(f"\n🧪 测试投票任务: {task_id}")
         
         # 创建结果保存器
-        saver = ResultSaver(self.votes_dir, f"单任务投票测试", f"任务ID{task_id}")
+        with ResultSaver(self.votes_dir, f"单任务投票测试", f"任务ID{task_id}") as saver:
         
-        valid, status, code, data = self.vote_check(task_id)
-        print(f"检查: {status} (code={code})")
-        saver.save_record(f"检查任务{task_id}", "✅" if valid else "❌", f"{status} (code={code})")
+            valid, status, code, data = self.vote_check(task_id)
+            print(f"检查: {status} (code={code})")
+            saver.save_record(f"检查任务{task_id}", "✅" if valid else "❌", f"{status} (code={code})")
         
-        if valid and input("确认投票？(y/n): ").lower() == 'y':
-            success, vote_status, vote_code, vote_msg, vote_data = self.vote_do(task_id)
-            print(f"投票: {vote_status} (code={vote_code}, msg={vote_msg}, data={vote_data})")
-            saver.save_record(f"投票任务{task_id}", "✅" if success else "❌", 
-                            f"{vote_status} (code={vote_code}, msg={vote_msg})")
-        else:
-            saver.save_record(f"投票任务{task_id}", "⏹️", "用户取消投票")
+            if valid and input("确认投票？(y/n): ").lower() == 'y':
+                success, vote_status, vote_code, vote_msg, vote_data = self.vote_do(task_id)
+                print(f"投票: {vote_status} (code={vote_code}, msg={vote_msg}, data={vote_data})")
+                saver.save_record(f"投票任务{task_id}", "✅" if success else "❌", 
+                                f"{vote_status} (code={vote_code}, msg={vote_msg})")
+            else:
+                saver.save_record(f"投票任务{task_id}", "⏹️", "用户取消投票")
 
-        saver.finalize(1 if valid else 0, 0, 1, 0)
-        print(f"📋 投票测试记录已保存: {saver.filepath}")
+            saver.finalize(1 if valid else 0, 0, 1, 0)
+            print(f"📋 投票测试记录已保存: {saver.filepath}")
 
     def vote_single_gui(self, task_id: int):
         """GUI版本的单次投票功能（无需交互输入，显示原始JSON响应）"""
@@ -2084,13 +2796,12 @@ class BDSMForumSpider:
 
         # 1. 先检查任务状态
         print(f"[检查] 任务 {task_id} 状态...")
-        url_check = f"{self.base_url}/api.php/play/pds"
         try:
-            r_check = requests.post(url_check, headers=self.headers, json={"id": str(task_id)}, timeout=5)
+            r_check = self.session.post(self.vote_check_url, json={"id": str(task_id)}, timeout=5)
             if r_check.status_code == 200:
-                check_data = r_check.json()
+                check_data = _json_loads(r_check.content)
                 # 限制 JSON 输出长度，避免卡顿
-                json_str = json.dumps(check_data, ensure_ascii=False, indent=2)
+                json_str = _json_dumps(check_data, indent=True)
                 if len(json_str) > 2000:
                     json_str = json_str[:2000] + "\n... (内容过长已截断)"
                 print(f"\n[检查响应]:\n{json_str}")
@@ -2107,13 +2818,12 @@ class BDSMForumSpider:
             return
 
         # 2. 执行投票
-        url_vote = f"{self.base_url}/api.php/play/pd_do"
         try:
-            r_vote = requests.post(url_vote, headers=self.headers, json={"id": task_id, "type": 1}, timeout=5)
+            r_vote = self.session.post(self.vote_do_url, json={"id": task_id, "type": 1}, timeout=5)
             if r_vote.status_code == 200:
-                vote_data = r_vote.json()
+                vote_data = _json_loads(r_vote.content)
                 # 限制 JSON 输出长度
-                json_str = json.dumps(vote_data, ensure_ascii=False, indent=2)
+                json_str = _json_dumps(vote_data, indent=True)
                 if len(json_str) > 2000:
                     json_str = json_str[:2000] + "\n... (内容过长已截断)"
                 print(f"\n[投票响应]:\n{json_str}")
@@ -2152,7 +2862,7 @@ class BDSMForumSpider:
             print("❌ 输入错误")
             return
         
-        task_ids = list(range(start, end + 1))
+        task_ids = range(start, end + 1)
         check_first = input("\n是否先检查任务有效性？(y/n，建议y): ").strip().lower() == 'y'
         
         try:
@@ -2172,185 +2882,193 @@ class BDSMForumSpider:
             return
         
         # 创建结果保存器
-        saver = ResultSaver(self.votes_dir, f"批量投票", f"ID{start}", f"ID{end}")
-        
-        results = {}
-        results_lock = threading.Lock()
-        output_order = list(range(start, end + 1))
-        next_output_idx = 0
-        output_lock = threading.Lock()
-        output_buffer = {}
-        success_count = 0
-        already_count = 0
-        failed_count = 0
-        success_ids = []
-        already_ids = []
-        start_time = time.time()
-        
-        def flush_output():
-            nonlocal next_output_idx, success_count, already_count, failed_count, success_ids, already_ids
+        with ResultSaver(self.votes_dir, f"批量投票", f"ID{start}", f"ID{end}") as saver:
+        
+            # 工作线程只把结果放入队列，由单独的输出线程按任务ID顺序打印和保存
+            output_queue = queue.SimpleQueue()
+            success_count = 0
+            already_count = 0
+            failed_count = 0
+            success_ids = []
+            already_ids = []
+            start_time = time.time()
+        
+            def output_worker():
+                nonlocal success_count, already_count, failed_count
             
-            while next_output_idx < len(output_order):
-                task_id = output_order[next_output_idx]
-                if task_id in output_buffer:
-                    result_type, code, msg, data = output_buffer[task_id]
-                    
-                    if result_type == "success":
-                        success_count += 1
-                        success_ids.append(task_id)
-                    elif result_type == "already":
-                        already_count += 1
-                        already_ids.append(task_id)
-                    else:
-                        failed_count += 1
+                next_id = start  # 下一个按顺序输出的任务ID
+                output_buffer = {}
+                while True:
+                    item = output_queue.get()
+                    if item is None:
+                        break
+                    output_buffer[item[0]] = item[1:]
+                
+                    while True:
+                        task_id = next_id
+                        buffered = output_buffer.pop(task_id, None)
+                        if buffered is None:
+                            break
+                        result_type, code, msg, data = buffered
                     
-                    if result_type == "success":
-                        status_icon = "✅"
-                        status_text = "成功"
-                    elif result_type == "already":
-                        status_icon = "🔄"
-                        status_text = "已投"
-                    else:
-                        status_icon = "❌"
-                        status_text = "失败"
+                        if result_type == "success":
+                            success_count += 1
+                            if success_count <= BATCH_VOTE_ID_LIST_LIMIT:
+                                success_ids.append(task_id)
+                        elif result_type == "already":
+                            already_count += 1
+                            if already_count <= BATCH_VOTE_ID_LIST_LIMIT:
+                                already_ids.append(task_id)
+                        else:
+                            failed_count += 1
                     
-                    display_msg = f"{msg}"
-                    if data and data != "":
-                        if isinstance(data, dict):
-                            data_str = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
-                            if len(data_str) > 30:
-                                data_str = data_str[:30] + "..."
-                            display_msg += f" data={data_str}"
+                        if result_type == "success":
+                            status_icon = "✅"
+                            status_text = "成功"
+                        elif result_type == "already":
+                            status_icon = "🔄"
+                            status_text = "已投"
                         else:
-                            data_str = str(data)
+                            status_icon = "❌"
+                            status_text = "失败"
+                    
+                        display_msg = f"{msg}"
+                        if data:
+                            data_str = _json_dumps(data) if isinstance(data, dict) else str(data)
                             if len(data_str) > 30:
                                 data_str = data_str[:30] + "..."
                             display_msg += f" data={data_str}"
                     
-                    completed = next_output_idx + 1
-                    total_tasks = len(task_ids)
-                    elapsed = time.time() - start_time
-                    speed = completed / elapsed if elapsed > 0 else 0
+                        completed = task_id - start + 1
+                        total_tasks = len(task_ids)
+                        elapsed = time.time() - start_time
+                        speed = completed / elapsed if elapsed > 0 else 0
                     
-                    stats_info = f"✅{success_count} 🔄{already_count} ❌{failed_count} ⚡{speed:.1f}/s"
-                    print(f"ID:{task_id} {status_icon}{status_text} code={code} {display_msg} | {stats_info}")
+                        stats_info = f"✅{success_count} 🔄{already_count} ❌{failed_count} ⚡{speed:.1f}/s"
+                        print(f"ID:{task_id} {status_icon}{status_text} code={code} {display_msg} | {stats_info}")
                     
-                    # 保存记录
-                    if result_type == "success":
-                        saver.save_record(f"任务{task_id}", "✅", f"投票成功: {msg}")
-                    elif result_type == "already":
-                        saver.save_record(f"任务{task_id}", "🔄", f"已投过票: {msg}")
-                    else:
-                        saver.save_record(f"任务{task_id}", "❌", f"投票失败: {msg}")
+                        # 保存记录
+                        if result_type == "success":
+                            saver.save_record(f"任务{task_id}", "✅", f"投票成功: {msg}")
+                        elif result_type == "already":
+                            saver.save_record(f"任务{task_id}", "🔄", f"已投过票: {msg}")
+                        else:
+                            saver.save_record(f"任务{task_id}", "❌", f"投票失败: {msg}")
                     
-                    del output_buffer[task_id]
-                    next_output_idx += 1
-                else:
-                    break
+                        next_id += 1
+                
+                    # 队列暂时取空时把这一批记录落盘
+                    if output_queue.empty():
+                        saver.flush()
+        
+            vote_check = self.vote_check
+            vote_do = self.vote_do
         
-        def process_task(task_id):
-            result_type = "failed"
-            code, msg, data = 0, "未知错误", ""
+            def process_task(task_id):
+                result_type = "failed"
+                code, msg, data = 0, "未知错误", ""
             
-            try:
-                if check_first:
-                    valid, _, check_code, check_msg, check_data = self.vote_check(task_id)
-                    if not valid:
-                        result_type, code, msg, data = "failed", check_code, check_msg, check_data
-                        
-                        with output_lock:
-                            output_buffer[task_id] = (result_type, code, msg, data)
-                            flush_output()
-                        
-                        with results_lock:
-                            results[task_id] = (result_type, code, msg, data)
-                        return
+                try:
+                    if check_first:
+                        valid, check_msg, check_code, check_data = vote_check(task_id)
+                        if not valid:
+                            output_queue.put((task_id, "failed", check_code, check_msg, check_data))
+                            return
                 
-                success, status, vote_code, vote_msg, vote_data = self.vote_do(task_id)
+                    success, status, vote_code, vote_msg, vote_data = vote_do(task_id)
                 
-                if success:
-                    if vote_code == 1:
-                        result_type = "success"
-                    else:
-                        result_type = "already"
+                    if success:
+                        if vote_code == 1:
+                            result_type = "success"
+                        else:
+                            result_type = "already"
                     
-                    code, msg, data = vote_code, vote_msg, vote_data
-                else:
-                    result_type = "failed"
-                    code, msg, data = vote_code, vote_msg, vote_data
+                        code, msg, data = vote_code, vote_msg, vote_data
+                    else:
+                        result_type = "failed"
+                        code, msg, data = vote_code, vote_msg, vote_data
                     
-            except Exception as e:
-                result_type, msg = "failed", "处理异常"
-                code, data = 0, ""
-            
-            with output_lock:
-                output_buffer[task_id] = (result_type, code, msg, data)
-                flush_output()
+                except Exception as e:
+                    result_type, msg = "failed", "处理异常"
+                    code, data = 0, ""
             
-            with results_lock:
-                results[task_id] = (result_type, code, msg, data)
+                output_queue.put((task_id, result_type, code, msg, data))
         
-        print("\n" + "="*50)
-        print("🚀 开始投票...")
-        print(f"💾 文件将保存到: {self.votes_dir}")
-        print("="*50)
+            print("\n" + "="*50)
+            print("🚀 开始投票...")
+            print(f"💾 文件将保存到: {self.votes_dir}")
+            print("="*50)
         
-        try:
-            with ThreadPoolExecutor(max_workers=threads) as executor:
-                futures = [executor.submit(process_task, task_id) for task_id in task_ids]
-                for future in as_completed(futures):
-                    pass
-        except Exception as e:
-            print(f"\n❌ 线程池异常: {e}")
+            printer = threading.Thread(target=output_worker, daemon=True)
+            printer.start()
+            try:
+                # process_task 自行捕获异常并写入输出队列，这里无需保留 future 列表
+                inflight = threading.BoundedSemaphore(threads * BATCH_VOTE_INFLIGHT_FACTOR)
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    for task_id in task_ids:
+                        inflight.acquire()
+                        executor.submit(process_task, task_id).add_done_callback(lambda _: inflight.release())
+            except Exception as e:
+                print(f"\n❌ 线程池异常: {e}")
+            finally:
+                output_queue.put(None)
+                printer.join()
         
-        elapsed = time.time() - start_time
-        speed = len(task_ids) / elapsed if elapsed > 0 else 0
+            elapsed = time.time() - start_time
+            speed = len(task_ids) / elapsed if elapsed > 0 else 0
         
-        print(f"\n" + "="*60)
-        print("🎯 投票完成！")
-        print("="*60)
-        print(f"📊 统计:")
-        print(f"  总任务: {len(task_ids)}")
-        print(f"  ✅ 成功: {success_count}")
-        print(f"  🔄 已投: {already_count}")
-        print(f"  ❌ 失败: {failed_count}")
-        
-        if success_ids:
-            print(f"\n✅ 成功ID ({len(success_ids)}个):")
-            for i in range(0, len(success_ids), 10):
-                ids_line = success_ids[i:i+10]
-                print(f"  {', '.join(map(str, ids_line))}")
-        
-        if already_ids:
-            print(f"\n🔄 已投ID ({len(already_ids)}个):")
-            for i in range(0, len(already_ids), 10):
-                ids_line = already_ids[i:i+10]
-                print(f"  {', '.join(map(str, ids_line))}")
-        
-        if len(task_ids) > 0:
-            success_rate = (success_count + already_count) / len(task_ids) * 100
-            print(f"\n📈 有效率: {success_rate:.1f}%")
-        
-        print(f"\n⏱️ 耗时: {elapsed:.1f}秒")
-        print(f"⚡ 速度: {speed:.1f}任务/秒")
-        
-        extra_stats = {
-            "成功投票数": success_count,
-            "已投过票数": already_count,
-            "投票失败数": failed_count,
-            "有效成功率": f"{success_rate:.1f}%",
-            "平均速度": f"{speed:.1f}任务/秒"
-        }
-        saver.finalize(success_count + already_count, failed_count, len(task_ids), elapsed, extra_stats)
-        print(f"\n💾 结果已保存: {saver.filepath}")
-        print(f"📁 查看所有投票文件: 选择菜单选项 10")
+            print(f"\n" + "="*60)
+            print("🎯 投票完成！")
+            print("="*60)
+            print(f"📊 统计:")
+            print(f"  总任务: {len(task_ids)}")
+            print(f"  ✅ 成功: {success_count}")
+            print(f"  🔄 已投: {already_count}")
+            print(f"  ❌ 失败: {failed_count}")
+        
+            if success_ids:
+                print(f"\n✅ 成功ID ({success_count}个):")
+                for i in range(0, len(success_ids), 10):
+                    ids_line = success_ids[i:i+10]
+                    print(f"  {', '.join(map(str, ids_line))}")
+                if success_count > len(success_ids):
+                    print(f"  ... 仅列出前 {len(success_ids)} 个，完整记录见结果文件")
+        
+            if already_ids:
+                print(f"\n🔄 已投ID ({already_count}个):")
+                for i in range(0, len(already_ids), 10):
+                    ids_line = already_ids[i:i+10]
+                    print(f"  {', '.join(map(str, ids_line))}")
+                if already_count > len(already_ids):
+                    print(f"  ... 仅列出前 {len(already_ids)} 个，完整记录见结果文件")
+        
+            if len(task_ids) > 0:
+                success_rate = (success_count + already_count) / len(task_ids) * 100
+                print(f"\n📈 有效率: {success_rate:.1f}%")
+        
+            print(f"\n⏱️ 耗时: {elapsed:.1f}秒")
+            print(f"⚡ 速度: {speed:.1f}任务/秒")
+        
+            extra_stats = {
+                "成功投票数": success_count,
+                "已投过票数": already_count,
+                "投票失败数": failed_count,
+                "有效成功率": f"{success_rate:.1f}%",
+                "平均速度": f"{speed:.1f}任务/秒"
+            }
+            saver.finalize(success_count + already_count, failed_count, len(task_ids), elapsed, extra_stats)
+            print(f"\n💾 结果已保存: {saver.filepath}")
+            print(f"📁 查看所有投票文件: 选择菜单选项 10")
 
     def show_vote_files(self):
         if not os.path.exists(self.votes_dir):
             print("❌ 还没有保存任何投票文件")
             return
         
-        vote_files = [f for f in os.listdir(self.votes_dir) if f.endswith('.txt')]
+        # scandir 一次拿到文件名，每个文件只 stat 一次
+        with os.scandir(self.votes_dir) as it:
+            vote_files = [(entry.name, entry.stat()) for entry in it
+                          if entry.name.endswith('.txt') and entry.is_file()]
         if not vote_files:
             print("❌ 投票目录为空")
             return
@@ -2358,10 +3076,9 @@ class BDSMForumSpider:
         print(f"\n🗳️  投票文件 ({len(vote_files)} 个):")
         print("=" * 50)
         
-        for filename in sorted(vote_files, reverse=True):
-            filepath = os.path.join(self.votes_dir, filename)
-            file_size = os.path.getsize(filepath)
-            file_time = time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getctime(filepath)))
+        for filename, st in sorted(vote_files, key=lambda item: item[0], reverse=True):
+            file_size = st.st_size
+            file_time = time.strftime("%Y-%m-%d %H:%M", time.localtime(st.st_ctime))
             
             print(f"📊 {filename} ({file_size/1024:.1f} KB, {file_time})")
         
@@ -2387,36 +3104,44 @@ class BDSMForumSpider:
         }
         
         try:
-            response = requests.post(
+            self.attention_limiter.acquire()
+            response = self.session.post(
                 url,
-                headers=self.headers,
                 json=payload,
                 timeout=30
             )
             
-            result = response.json()
-            return result
+            return _json_loads(response.content)
                 
         except Exception as e:
             print(f"❌ 请求异常: {e}")
             return None
 
+    def fetch_attention_pages(self, user_id, pages, threads: int = 8):
+        """
+        并发获取多页关注列表，复用共享会话的连接池
+        :param pages: 页码列表
+        :return: 与 pages 顺序一致的 API 响应列表（失败的页为 None）
+        """
+        pages = list(pages)
+        if len(pages) <= 1:
+            return [self.get_attention_list(user_id, p) for p in pages]
+        
+        with ThreadPoolExecutor(max_workers=min(threads, len(pages))) as executor:
+            return list(executor.map(lambda p: self.get_attention_list(user_id, p), pages))
+
     def timestamp_to_datetime(self, timestamp):
         """将Unix时间戳转换为可读的日期时间字符串"""
-        if not timestamp:
-            return None
-        try:
-            # 检查时间戳是否合理（1970年至今）
-            if timestamp < 0 or timestamp > 2000000000:
-                return None
-            dt = datetime.fromtimestamp(timestamp)
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except:
+        # 只接受数值且在合理范围内（1970年至今）的时间戳，不走异常分支
+        if not isinstance(timestamp, (int, float)) or not 0 < timestamp <= 2000000000:
             return None
+        return _fmt_ts(timestamp)
 
     def parse_attention_list(self, result):
         """
         解析关注列表数据
+        同一次遍历中给原始数据的每一项补上 'user' 字段（'u' 的副本 + user_url），
+        之后保存时可传 users_attached=True 跳过再次遍历
         :param result: API返回的数据
         :return: 格式化后的关注列表
         """
@@ -2429,54 +3154,61 @@ class BDSMForumSpider:
             data = result.get('data', {})
             attention_list = data.get('data', [])
             
-            parsed_list = []
+            # 每项都会生成一条结果，按长度预先分配后按下标填入
+            parsed_list = [None] * len(attention_list)
+            user_url_prefix = f"{self.base_url}/pd/#/page/user_show/user_show?id="
             
-            for i, item in enumerate(attention_list, 1):
+            for idx, item in enumerate(attention_list):
                 # 获取被关注者ID
                 followed_id = item.get('uid')
                 
                 # 关键修改：使用 'u' 字段而不是 'user' 字段
-                user_data = item.get('u', {})
+                user_data = item.get('u')
+                user_url = f"{user_url_prefix}{followed_id}"
+                
+                # 复制 'u' 字段到 'user' 字段并添加 user_url（供保存使用）
+                if user_data is not None:
+                    item["user"] = {**user_data, "user_url": user_url}
+                else:
+                    # 如果没有 u 字段，只添加基本信息
+                    user_data = {}
+                    item["user"] = {
+                        "id": followed_id,
+                        "user_name": f"用户_{followed_id}",
+                        "user_url": user_url
+                    }
                 
                 # 获取用户信息
-                user_name = user_data.get('user_name', f"用户_{followed_id}")
-                nick_name = user_data.get('nick_name', user_name)
+                ug = user_data.get
+                user_name = ug('user_name', f"用户_{followed_id}")
+                nick_name = ug('nick_name', user_name)
                 
-                # 获取年龄
-                age_raw = user_data.get('age', '')
-                if age_raw is None:
-                    age = ''
-                elif isinstance(age_raw, int):
-                    age = str(age_raw)
-                elif isinstance(age_raw, str) and age_raw.isdigit():
-                    age = age_raw
-                else:
-                    age = str(age_raw)
+                # 获取年龄（None 视为空，其余统一转成字符串）
+                age_raw = ug('age', '')
+                age = '' if age_raw is None else str(age_raw)
                 
                 # 获取生日
-                birthday = user_data.get('birthday', '')
+                birthday = ug('birthday', '')
                 if birthday is None:
                     birthday = ''
                 
-                # 获取性别、性取向、角色信息（直接使用文本形式）
-                sex_text = user_data.get('sex_text', '')
-                sex_o_text = user_data.get('sex_o_text', '')
-                sex_p_text = user_data.get('sex_p_text', '')
-                
                 # 获取最后在线时间
-                last_time_raw = user_data.get('last_time')
+                last_time_raw = ug('last_time')
                 last_time_str = ""
                 if last_time_raw:
                     try:
                         if isinstance(last_time_raw, (int, float)) and last_time_raw > 0:
-                            last_time_str = datetime.fromtimestamp(last_time_raw).strftime("%Y-%m-%d %H:%M:%S")
+                            last_time_str = _fmt_ts(last_time_raw)
                         else:
                             last_time_str = str(last_time_raw)
                     except:
                         last_time_str = str(last_time_raw)
                 
+                create_time = item.get('create_time')
+                update_time = item.get('update_time')
+                
                 # 构建用户信息（统一格式）
-                parsed_item = {
+                parsed_list[idx] = {
                     'attention_id': item.get('id'),
                     'follower_id': item.get('user_id'),
                     'user_id': followed_id,
@@ -2484,23 +3216,22 @@ class BDSMForumSpider:
                     'nick_name': nick_name,
                     'age': age,
                     'birthday': birthday,
-                    'sex': sex_text,
-                    'sex_orientation': sex_o_text,
-                    'role': sex_p_text,
-                    'height': user_data.get('height', ''),
-                    'weight': user_data.get('weight', ''),
-                    'country': user_data.get('country', ''),
-                    'country_pic': user_data.get('country_pic', ''),
-                    'intro': user_data.get('intro', ''),
+                    # 性别、性取向、角色直接使用文本形式
+                    'sex': ug('sex_text', ''),
+                    'sex_orientation': ug('sex_o_text', ''),
+                    'role': ug('sex_p_text', ''),
+                    'height': ug('height', ''),
+                    'weight': ug('weight', ''),
+                    'country': ug('country', ''),
+                    'country_pic': ug('country_pic', ''),
+                    'intro': ug('intro', ''),
                     'last_time': last_time_str,
-                    'user_url': f"{self.base_url}/pd/#/page/user_show/user_show?id={followed_id}",
-                    'create_time': self.timestamp_to_datetime(item.get('create_time')),
-                    'create_time_timestamp': item.get('create_time'),
-                    'update_time': self.timestamp_to_datetime(item.get('update_time')),
-                    'update_time_timestamp': item.get('update_time'),
+                    'user_url': user_url,
+                    'create_time': self.timestamp_to_datetime(create_time),
+                    'create_time_timestamp': create_time,
+                    'update_time': self.timestamp_to_datetime(update_time),
+                    'update_time_timestamp': update_time,
                 }
-                
-                parsed_list.append(parsed_item)
             
             return {
                 'code': 1,
@@ -2509,7 +3240,7 @@ class BDSMForumSpider:
                 'per_page': data.get('per_page', 20),
                 'total_count': data.get('total'),
                 'list': parsed_list,
-                'query_time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'query_time': _now_str(),
                 'query_timestamp': int(time.time())
             }
         else:
@@ -2528,27 +3259,32 @@ class BDSMForumSpider:
         if not parsed_data:
             return
         
-        print(f"\n{'='*60}")
-        print(f"用户 {user_id} 的关注列表")
-        print(f"查询时间: {parsed_data.get('query_time', '未知')}")
-        print(f"{'='*60}")
+        # 所有行拼好后一次输出，避免每个用户十几次 print
+        lines = [
+            f"\n{'='*60}",
+            f"用户 {user_id} 的关注列表",
+            f"查询时间: {parsed_data.get('query_time', '未知')}",
+            f"{'='*60}",
+        ]
         
         if parsed_data.get('code') != 1:
+            print("\n".join(lines))
             return
         
         if not parsed_data.get('list'):
-            print("该用户没有关注任何人")
+            lines.append("该用户没有关注任何人")
+            print("\n".join(lines))
             return
         
-        print(f"第 {parsed_data['current_page']} 页/共 {parsed_data['total_pages'] if parsed_data['total_pages'] else '未知'} 页")
-        print(f"每页 {parsed_data['per_page']} 条，总关注数: {parsed_data['total_count'] if parsed_data['total_count'] else '未知'}")
-        print(f"{'-'*60}")
+        lines.append(f"第 {parsed_data['current_page']} 页/共 {parsed_data['total_pages'] if parsed_data['total_pages'] else '未知'} 页")
+        lines.append(f"每页 {parsed_data['per_page']} 条，总关注数: {parsed_data['total_count'] if parsed_data['total_count'] else '未知'}")
+        lines.append(f"{'-'*60}")
         
         for i, user in enumerate(parsed_data['list'], 1):
             # 优先显示昵称，没有昵称则显示用户名
             display_name = user.get('nick_name') or user.get('user_name') or f"用户{user['user_id']}"
     
-            print(f"{i:2d}. ID: {user['user_id']:6d} | {display_name}")
+            lines.append(f"{i:2d}. ID: {user['user_id']:6d} | {display_name}")
             
             # 使用统一格式显示用户信息
             user_display_info = {
@@ -2567,20 +3303,27 @@ class BDSMForumSpider:
                 "user_url": user.get('user_url', '')
             }
             
-            # 使用统一的显示函数
-            self.display_complete_user_info(user_display_info, prefix="     ", compact=True)
+            # 使用统一的显示函数（追加到 lines，稍后统一输出）
+            self.display_complete_user_info(user_display_info, prefix="     ", compact=True, out=lines)
             
             # 显示关注时间
             if user['create_time']:
-                print(f"     关注时间: {user['create_time']}")
+                lines.append(f"     关注时间: {user['create_time']}")
             
-            print(f"{'-'*40}")
+            lines.append(f"{'-'*40}")
+        
+        print("\n".join(lines))
 
-    def save_attention_data(self, data, user_id, page=1):
-        """保存关注列表数据（带中文注释）"""
+    def save_attention_data(self, data, user_id, page=1, users_attached=False, background=False):
+        """
+        保存关注列表数据（带中文注释）
+        :param users_attached: data 已经过 parse_attention_list（每项已有 'user' 字段），不再重复遍历
+        :param background: 注释渲染和写文件交给后台线程，立即返回 Future（结果为是否保存成功）；
+                           提前失败时返回已完成的 Future
+        """
         if not data:
             print("❌ 没有数据可以保存")
-            return False
+            return self._done_future(False) if background else False
         
         # 确保关注目录存在
         os.makedirs(self.attention_dir, exist_ok=True)
@@ -2595,39 +3338,38 @@ class BDSMForumSpider:
         except:
             pass
         
-        # 生成文件名：用户ID_用户名.txt
+        # 生成文件名：用户ID_用户名.txt（第1页以外加页码后缀，多页保存时互不覆盖）
+        page_suffix = f"_第{page}页" if page != 1 else ""
         if queried_username:
-            safe_username = INVALID_CHARS.sub("_", queried_username)[:20]
-            filename = f"{user_id}_{safe_username}.txt"
+            safe_username = queried_username[:20].translate(INVALID_CHARS_TABLE)
+            filename = f"{user_id}_{safe_username}{page_suffix}.txt"
         else:
-            filename = f"{user_id}_用户关注列表.txt"
+            filename = f"{user_id}_用户关注列表{page_suffix}.txt"
         
         filepath = os.path.join(self.attention_dir, filename)
         
         try:
             # 关键修改：不再重新获取用户信息，直接复制 'u' 字段到 'user' 字段
-            # 并添加 user_url
-            for item in data["data"]["data"]:
-                if "u" in item:
-                    # 复制 u 字段到 user 字段
-                    item["user"] = dict(item["u"])
-                    
-                    # 添加用户链接
+            # 并添加 user_url（一次合并构建，不再先复制再补字段）
+            if not users_attached:
+                user_url_prefix = f"{self.base_url}/pd/#/page/user_show/user_show?id="
+                for item in data["data"]["data"]:
                     uid = item["uid"]
-                    item["user"]["user_url"] = f"{self.base_url}/pd/#/page/user_show/user_show?id={uid}"
-                else:
-                    # 如果没有 u 字段，只添加基本信息
-                    uid = item["uid"]
-                    item["user"] = {
-                        "id": uid,
-                        "user_name": f"用户_{uid}",
-                        "user_url": f"{self.base_url}/pd/#/page/user_show/user_show?id={uid}"
-                    }
+                    u = item.get("u")
+                    if u is not None:
+                        item["user"] = {**u, "user_url": f"{user_url_prefix}{uid}"}
+                    else:
+                        # 如果没有 u 字段，只添加基本信息
+                        item["user"] = {
+                            "id": uid,
+                            "user_name": f"用户_{uid}",
+                            "user_url": f"{user_url_prefix}{uid}"
+                        }
             
             # 构建数据结构
             full_data = {
                 "_query_info": {
-                    "query_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "query_time": _now_str(),
                     "query_timestamp": int(time.time()),
                     "user_id": user_id,
                     "page": page
@@ -2635,35 +3377,114 @@ class BDSMForumSpider:
                 "_note": "字段后的//注释为中文翻译",
                 "api_response": data
             }
-            
+        except Exception as e:
+            print(f"❌ 保存文件失败: {e}")
+            if DEBUG:
+                traceback.print_exc()
+            return self._done_future(False) if background else False
+        
+        if background:
+            # full_data 之后不再被修改，直接交给后台线程，无需复制
+            return self._attention_writer.submit(
+                self._write_attention_file, filepath, full_data, user_id, queried_username, page)
+        return self._write_attention_file(filepath, full_data, user_id, queried_username, page)
+
+    @staticmethod
+    def _done_future(result):
+        """返回一个已完成的 Future，让后台保存的调用方统一用 .result() 取结果"""
+        future = Future()
+        future.set_result(result)
+        return future
+
+    def _write_attention_file(self, filepath, full_data, user_id, queried_username, page):
+        """渲染带注释的关注数据并写入文件"""
+        try:
             # 生成带注释的JSON文本
             formatted_json = self.format_json_with_comments(full_data)
             
-            # 写入文件
+            # 一次拼好全文后单次写入，避免围绕大段JSON的多次小写入
+            now_str = _now_str()
+            parts = [
+                f"{'='*60}\n",
+                f"📋 用户关注列表查询结果\n",
+                f"👤 被查询用户: {user_id} | {queried_username if queried_username else '未知用户'}\n",
+                f"📄 页码: 第 {page} 页\n",
+                f"⏰ 查询时间: {now_str}\n",
+                f"{'='*60}\n\n",
+                "📝 带中文注释的JSON数据:\n",
+                "-" * 60 + "\n",
+                formatted_json,
+                f"\n{'='*60}\n",
+                f"💾 文件保存时间: {now_str}\n",
+                f"📁 文件位置: {filepath}\n",
+                "=" * 60,
+            ]
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(f"{'='*60}\n")
-                f.write(f"📋 用户关注列表查询结果\n")
-                f.write(f"👤 被查询用户: {user_id} | {queried_username if queried_username else '未知用户'}\n")
-                f.write(f"📄 页码: 第 {page} 页\n")
-                f.write(f"⏰ 查询时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"{'='*60}\n\n")
-                f.write("📝 带中文注释的JSON数据:\n")
-                f.write("-" * 60 + "\n")
-                f.write(formatted_json)
-                f.write(f"\n{'='*60}\n")
-                f.write(f"💾 文件保存时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"📁 文件位置: {filepath}\n")
-                f.write("=" * 60)
+                f.write("".join(parts))
             
             print(f"✅ 关注数据已保存: {filepath}")
             return True
             
         except Exception as e:
             print(f"❌ 保存文件失败: {e}")
-            import traceback
-            traceback.print_exc()
+            if DEBUG:
+                traceback.print_exc()
             return False
         
+    def _query_attention_core(self, user_id, page=1, save=True, result=None, background=False):
+        """
+        单页关注列表的 获取→解析→显示→保存 流程（不含交互输入）
+        :param result: 已预先获取的API响应，为 None 时在此请求
+        :param save: 是否自动保存
+        :param background: 保存交给后台写入线程
+        :return: (API响应, 保存结果)；获取或解析失败时 API响应 为 None，
+                 保存结果为 save_attention_data 的返回值（未保存时为 None）
+        """
+        if result is None:
+            result = self.get_attention_list(user_id, page)
+        
+        if not result:
+            print(f"❌ 第 {page} 页获取数据失败")
+            return None, None
+        
+        if result.get('code') != 1:
+            print(f"❌ 第 {page} 页API返回错误: {result.get('msg', '未知错误')}")
+            return None, None
+        
+        # 解析数据
+        parsed_data = self.parse_attention_list(result)
+        if not parsed_data:
+            return None, None
+        
+        # 显示数据（统一格式）
+        self.print_attention_list(parsed_data, user_id)
+        
+        if not save:
+            return result, None
+        return result, self.save_attention_data(
+            result, user_id, page, users_attached=True, background=background)
+
+    def query_attention_batch(self, jobs, threads: int = 8):
+        """
+        批量查询并保存多个用户的关注列表（无需交互输入）
+        :param jobs: [(用户ID, 页码), ...]
+        :return: 与 jobs 顺序一致的保存结果列表（True/False，获取失败为 None）
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+        
+        def run(job):
+            user_id, page = job
+            try:
+                return self._query_attention_core(user_id, page)[1]
+            except Exception as e:
+                print(f"❌ 查询用户 {user_id} 第 {page} 页异常: {e}")
+                return None
+        
+        with ThreadPoolExecutor(max_workers=min(threads, len(jobs))) as executor:
+            return list(executor.map(run, jobs))
+
     def query_attention_list(self):
         """查询关注列表"""
         print("\n" + "="*60)
@@ -2685,24 +3506,10 @@ class BDSMForumSpider:
             
             print(f"\n正在查询用户 {user_id} 的关注列表 (第 {page} 页)...")
             
-            # 获取数据
-            result = self.get_attention_list(user_id, page)
+            # 获取、解析并显示数据
+            result, _ = self._query_attention_core(user_id, page, save=False)
             
-            if not result:
-                print("❌ 获取数据失败")
-                continue
-            
-            if result.get('code') != 1:
-                print(f"❌ API返回错误: {result.get('msg', '未知错误')}")
-                continue
-            
-            # 解析数据
-            parsed_data = self.parse_attention_list(result)
-            
-            if parsed_data:
-                # 显示数据（统一格式）
-                self.print_attention_list(parsed_data, user_id)
-                
+            if result:
                 # 询问保存选项
                 print("\n📁 保存选项:")
                 print("1. 保存带中文注释的完整数据")
@@ -2711,7 +3518,7 @@ class BDSMForumSpider:
                 save_choice = input("\n请选择保存方式 (1-2): ").strip()
                 
                 if save_choice == "1":
-                    self.save_attention_data(result, user_id, page)
+                    self.save_attention_data(result, user_id, page, users_attached=True)
             
             # 询问是否继续查询
             continue_query = input("\n是否继续查询其他用户？(y/N): ").strip().lower()
@@ -2735,8 +3542,7 @@ class BDSMForumSpider:
         self.display_post_for_browsing(detail, index=1)
 
         # 获取用户信息并保存
-        user_info = detail.get("user", {})
-        user_id = user_info.get("id") or detail.get("user_id")
+        user_id = _extract_user_id(detail)
 
         if user_id:
             complete_user_info = self.get_complete_user_info(user_id)
@@ -2764,15 +3570,24 @@ class BDSMForumSpider:
             self.display_complete_user_info(user_info, prefix="   ")
 
         all_posts = []
-        page = 1
-        total_saved = 0
         actual_pages_crawled = 0
 
+        def save_page(page, posts):
+            page_saved = 0
+            for post in posts:
+                if self.save_post_for_user_crawl(post, user_info, manual_mode=False):
+                    page_saved += 1
+            print(f"[保存] 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
+            return page_saved
+
         print(f"\n[开始] 获取用户 {user_id} 的帖子...")
 
-        while page <= max_pages:
+        # 多页并发预取，按页码顺序处理；所有帖子写入同一用户文件，
+        # 由单个后台线程按顺序保存，与后续页面的显示并行
+        save_executor = ThreadPoolExecutor(max_workers=1)
+        save_futures = []
+        for page, result in self.iter_user_post_pages(user_id, max_pages):
             print(f"\n[进度] 正在获取第 {page}/{max_pages} 页...")
-            result = self.get_user_posts(user_id, page)
 
             if not result["success"]:
                 print(f"[失败] 第 {page} 页获取失败: {result.get('error', '未知错误')}")
@@ -2793,23 +3608,21 @@ class BDSMForumSpider:
                 post_index = len(all_posts) - len(posts) + i
                 self.display_post_for_browsing(post, index=post_index)
 
-            # 自动保存当前页的帖子
-            if posts:
-                page_saved = 0
-                for post in posts:
-                    if self.save_post_for_user_crawl(post, user_info, manual_mode=False):
-                        page_saved += 1
-                        total_saved += 1
-                    time.sleep(0.1)
-                print(f"[保存] 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
+            # 自动保存当前页的帖子（后台进行）
+            save_futures.append(save_executor.submit(save_page, page, posts))
 
-            # 检查是否还有更多页
+            # 检查是否还有更多页（请求频率由 get_user_posts 内的限速器控制）
             if not result.get("has_more", False):
                 print("[提示] 已到最后一页")
                 break
 
-            page += 1
-            time.sleep(0.5)
+        save_executor.shutdown(wait=True)
+        total_saved = 0
+        for future in save_futures:
+            try:
+                total_saved += future.result()
+            except Exception as e:
+                print(f"[警告] 保存任务异常: {e}")
 
         # 统计总结果
         print(f"\n{'='*50}")
@@ -2830,64 +3643,72 @@ class BDSMForumSpider:
         print("=" * 40)
 
         # 创建结果保存器
-        saver = ResultSaver(self.search_dir, f"帖子搜索_{keyword}", f"第1页", f"第{max_pages}页")
+        with ResultSaver(self.search_dir, f"帖子搜索_{keyword}", f"第1页", f"第{max_pages}页") as saver:
 
-        all_posts = []
-        total_saved = 0
-        start_time = time.time()
+            all_posts = []
+            total_saved = 0
+            start_time = time.time()
 
-        for page in range(1, max_pages + 1):
-            print(f"\n📄 正在搜索第 {page} 页...")
-            result = self.search_posts_with_page(keyword, page)
+            def save_user_posts(item):
+                user_id, user_post_list = item
+                saved = 0
+                complete_user_info = self.get_complete_user_info(user_id)
+                for post in user_post_list:
+                    if complete_user_info:
+                        if self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False):
+                            saved += 1
+                    self.save_limiter.acquire()
+                return saved
+
+            save_executor = ThreadPoolExecutor(max_workers=SAVE_POST_THREADS)
+            # 多页并发预取，按页码顺序处理
+            for page, result in self.iter_search_pages(keyword, max_pages):
+                print(f"\n📄 正在搜索第 {page} 页...")
+
+                if not result or not result.get("success"):
+                    error_msg = result.get('error', '未知错误') if result else '请求失败'
+                    print(f"❌ 第 {page} 页搜索失败: {error_msg}")
+                    break
 
-            if not result or not result.get("success"):
-                error_msg = result.get('error', '未知错误') if result else '请求失败'
-                print(f"❌ 第 {page} 页搜索失败: {error_msg}")
-                break
+                posts = result.get("data", [])
+                if not posts:
+                    print(f"📭 第 {page} 页没有找到相关帖子")
+                    break
 
-            posts = result.get("data", [])
-            if not posts:
-                print(f"📭 第 {page} 页没有找到相关帖子")
-                break
+                print(f"✅ 第 {page} 页找到 {len(posts)} 个相关帖子")
+                all_posts.extend(posts)
+                self.prefetch_user_infos(posts)
 
-            print(f"✅ 第 {page} 页找到 {len(posts)} 个相关帖子")
-            all_posts.extend(posts)
+                # 显示帖子，并按作者分组待保存
+                user_posts = OrderedDict()  # user_id -> [帖子]
+                for idx, post in enumerate(posts, 1):
+                    # 类型检查：确保 post 是字典
+                    if not isinstance(post, dict):
+                        print(f"⚠️ 跳过非法数据格式: {type(post)}")
+                        continue
 
-            # 显示并自动保存
-            page_saved = 0
-            for idx, post in enumerate(posts, 1):
-                # 类型检查：确保 post 是字典
-                if not isinstance(post, dict):
-                    print(f"⚠️ 跳过非法数据格式: {type(post)}")
-                    continue
+                    # 显示帖子内容
+                    post_index = len(all_posts) - len(posts) + idx
+                    self.display_post_for_browsing(post, post_index)
 
-                # 显示帖子内容
-                post_index = len(all_posts) - len(posts) + idx
-                self.display_post_for_browsing(post, post_index)
-
-                # 类型检查：确保 user_info 是字典
-                user_info = post.get("user", {})
-                if not isinstance(user_info, dict):
-                    user_info = {}
-                user_id = user_info.get("id") or post.get("user_id")
-                if user_id:
-                    complete_user_info = self.get_complete_user_info(user_id)
-                    if complete_user_info:
-                        if self.save_post_for_user_crawl(post, complete_user_info, manual_mode=False):
-                            page_saved += 1
-                            total_saved += 1
-                time.sleep(0.2)
+                    user_id = _extract_user_id(post)
+                    if user_id:
+                        user_posts.setdefault(user_id, []).append(post)
 
-            print(f"📝 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
+                # 同一作者的帖子按顺序写入同一文件，不同作者之间并行；本页保存完再处理下一页，保证同一文件内的顺序
+                page_saved = sum(save_executor.map(save_user_posts, user_posts.items()))
+                total_saved += page_saved
 
-            if page < max_pages:
-                time.sleep(1)
+                print(f"📝 第 {page} 页保存了 {page_saved}/{len(posts)} 个帖子")
 
-        elapsed = time.time() - start_time
-        print(f"\n🔍 搜索完成！")
-        print(f"📊 总计: 找到 {len(all_posts)} 个帖子，保存 {total_saved} 个")
-        print(f"⏱️  耗时: {elapsed:.1f}秒")
-        print(f"💾 保存位置: {self.search_dir}/")
+            save_executor.shutdown(wait=True)
+
+            elapsed = time.time() - start_time
+            print(f"\n🔍 搜索完成！")
+            print(f"📊 总计: 找到 {len(all_posts)} 个帖子，保存 {total_saved} 个")
+            print(f"⏱️  耗时: {elapsed:.1f}秒")
+            print(f"💾 保存位置: {self.search_dir}/")
+            saver.close()
 
     def search_username_gui(self, keyword, max_pages=30, threads=8):
         """GUI版本的用户名搜索功能（无需交互输入）"""
@@ -2914,11 +3735,7 @@ class BDSMForumSpider:
         # 自动保存找到的用户到搜索目录
         if found_users:
             print("\n💾 正在保存用户信息到搜索目录...")
-            saved_count = 0
-            for user in found_users:
-                if self.save_user_info_to_search_dir(user):
-                    saved_count += 1
-                time.sleep(0.1)
+            saved_count = self.save_users_to_search_dir(found_users, threads)
             print(f"✅ 已将 {saved_count}/{len(found_users)} 个用户保存到 {self.search_dir}/")
 
         return found_users
@@ -2952,24 +3769,25 @@ class BDSMForumSpider:
         print(f"⚡ 使用 {threads} 线程")
         print("=" * 60)
 
-        task_ids = list(range(start_id, end_id + 1))
+        task_ids = range(start_id, end_id + 1)
 
         # 创建结果保存器
-        saver = ResultSaver(self.votes_dir, f"批量投票", f"ID{start_id}", f"ID{end_id}")
-
-        results = {}
-        results_lock = threading.Lock()
-        success_count = 0
-        already_count = 0
-        failed_count = 0
-        start_time = time.time()
-
-        def process_task(task_id):
-            nonlocal success_count, already_count, failed_count
-            try:
-                success, status, vote_code, vote_msg, vote_data = self.vote_do(task_id)
-
-                with results_lock:
+        with ResultSaver(self.votes_dir, f"批量投票", f"ID{start_id}", f"ID{end_id}") as saver:
+
+            # 投票线程只把结果放进队列，计数、写记录、输出都由单个输出线程完成，无需加锁
+            output_queue = queue.SimpleQueue()
+            success_count = 0
+            already_count = 0
+            failed_count = 0
+            start_time = time.time()
+
+            def output_worker():
+                nonlocal success_count, already_count, failed_count
+                while True:
+                    item = output_queue.get()
+                    if item is None:
+                        break
+                    task_id, success, vote_code, vote_msg = item
                     if success:
                         if vote_code == 1:
                             success_count += 1
@@ -2979,90 +3797,137 @@ class BDSMForumSpider:
                             already_count += 1
                             saver.save_record(f"任务{task_id}", "🔄", f"已投过票: {vote_msg}")
                             print(f"ID:{task_id} 🔄 已投 | ✅{success_count} 🔄{already_count} ❌{failed_count}")
+                    elif success is None:
+                        # 投票过程抛出异常：只计数，与原先行为一致
+                        failed_count += 1
                     else:
                         failed_count += 1
                         saver.save_record(f"任务{task_id}", "❌", f"投票失败: {vote_msg}")
                         print(f"ID:{task_id} ❌ 失败 | ✅{success_count} 🔄{already_count} ❌{failed_count}")
+                    # 队列暂时取空时把这一批记录落盘
+                    if output_queue.empty():
+                        saver.flush()
 
-                    results[task_id] = (success, vote_code, vote_msg)
-            except Exception as e:
-                with results_lock:
-                    failed_count += 1
-                    results[task_id] = (False, 0, str(e))
+            vote_do = self.vote_do
 
-        # 使用线程池执行投票
-        with ThreadPoolExecutor(max_workers=threads) as executor:
-            futures = [executor.submit(process_task, tid) for tid in task_ids]
-            for future in as_completed(futures):
+            def process_task(task_id):
                 try:
-                    future.result()
-                except Exception as e:
-                    print(f"⚠️ 任务异常: {e}")
-
-        elapsed = time.time() - start_time
-        print(f"\n✅ 批量投票完成！")
-        print(f"📊 统计: 成功 {success_count} | 已投 {already_count} | 失败 {failed_count}")
-        print(f"⏱️ 耗时: {elapsed:.1f}秒")
-        print(f"💾 结果保存到: {self.votes_dir}")
-
-        extra_stats = {
-            "投票成功": success_count,
-            "已投过票": already_count,
-            "投票失败": failed_count,
-            "成功率": f"{(success_count/(len(task_ids))*100):.1f}%" if task_ids else "0%"
-        }
-        saver.finalize(success_count, failed_count, len(task_ids), elapsed, extra_stats)
+                    success, status, vote_code, vote_msg, vote_data = vote_do(task_id)
+                except Exception:
+                    output_queue.put((task_id, None, None, None))
+                    return
+                output_queue.put((task_id, success, vote_code, vote_msg))
 
-    def query_attention_gui(self, user_id, page=1):
-        """GUI版本的关注列表查询功能（无需交互输入）"""
-        print(f"\n📋 查询用户 {user_id} 的关注列表 (第 {page} 页)")
+            printer = threading.Thread(target=output_worker, daemon=True)
+            printer.start()
+            try:
+                # 使用线程池执行投票
+                with ThreadPoolExecutor(max_workers=threads) as executor:
+                    futures = [executor.submit(process_task, tid) for tid in task_ids]
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            print(f"⚠️ 任务异常: {e}")
+            finally:
+                output_queue.put(None)
+                printer.join()
+
+            elapsed = time.time() - start_time
+            print(f"\n✅ 批量投票完成！")
+            print(f"📊 统计: 成功 {success_count} | 已投 {already_count} | 失败 {failed_count}")
+            print(f"⏱️ 耗时: {elapsed:.1f}秒")
+            print(f"💾 结果保存到: {self.votes_dir}")
+
+            extra_stats = {
+                "投票成功": success_count,
+                "已投过票": already_count,
+                "投票失败": failed_count,
+                "成功率": f"{(success_count/(len(task_ids))*100):.1f}%" if task_ids else "0%"
+            }
+            saver.finalize(success_count, failed_count, len(task_ids), elapsed, extra_stats)
+
+    def query_attention_gui(self, user_id, page=1, pages=1):
+        """GUI版本的关注列表查询功能（无需交互输入）
+        pages > 1 时从 page 开始并发获取连续多页"""
+        page_list = list(range(page, page + max(1, pages)))
+        if len(page_list) > 1:
+            print(f"\n📋 查询用户 {user_id} 的关注列表 (第 {page_list[0]}-{page_list[-1]} 页)")
+        else:
+            print(f"\n📋 查询用户 {user_id} 的关注列表 (第 {page} 页)")
         print("=" * 60)
 
-        # 获取数据
-        result = self.get_attention_list(user_id, page)
-
-        if not result:
-            print("❌ 获取数据失败")
-            return
+        # 获取数据（多页并发请求，按页码顺序处理）
+        results = self.fetch_attention_pages(user_id, page_list)
+
+        # 逐页解析显示并自动保存（后台渲染写入，继续显示下一页）
+        save_futures = []
+        for current_page, result in zip(page_list, results):
+            _, future = self._query_attention_core(
+                user_id, current_page, result=result, background=True)
+            # 获取或解析失败的页没有保存任务
+            if future is not None:
+                save_futures.append(future)
+
+        saved = 0
+        for future in save_futures:
+            if future.result():
+                saved += 1
+        if saved:
+            print(f"💾 关注列表已保存到: {self.attention_dir}")
 
-        if result.get('code') != 1:
-            print(f"❌ API返回错误: {result.get('msg', '未知错误')}")
-            return
+# ---------- 账号管理 ----------
+PHONE_MASK_KEY = "手机号_掩码"  # 保存账号时按手机号生成的脱敏手机号，显示时直接读取
 
-        # 解析数据
-        parsed_data = self.parse_attention_list(result)
+def _mask_phone(phone):
+    return f"{phone[:3]}****{phone[-4:]}"
 
-        if parsed_data:
-            # 显示数据（统一格式）
-            self.print_attention_list(parsed_data, user_id)
+def masked_phone(acc):
+    """账号的脱敏手机号：优先取保存时生成的值（旧账号文件没有时现算）"""
+    masked = acc.get(PHONE_MASK_KEY)
+    if masked is None:
+        phone = acc.get("手机号", "")
+        masked = _mask_phone(phone) if phone else ""
+    return masked
 
-            # 自动保存
-            self.save_attention_data(result, user_id, page)
-            print(f"💾 关注列表已保存到: {self.attention_dir}")
+def _index_accounts(spider, accounts):
+    """更新 token -> 账号 索引（同一 token 有多个账号时保留排在前面的）"""
+    spider._account_by_token = {acc.get("Token"): acc for acc in reversed(accounts)}
 
-# ---------- 账号管理 ----------
 def load_accounts(spider):
     try:
-        with open(spider.accounts_file, "r", encoding="utf-8") as f:
-            acc = json.load(f)
+        with open(spider.accounts_file, "rb") as f:
+            acc = _json_loads(f.read())
             acc.sort(key=lambda x: x.get("最后登录", ""), reverse=True)
-            return acc
     except:
-        return []
+        acc = []
+    _index_accounts(spider, acc)
+    return acc
 
 def save_accounts(spider, accounts):
-    with open(spider.accounts_file, "w", encoding="utf-8") as f:
-        json.dump(accounts, f, ensure_ascii=False, indent=2)
+    for acc in accounts:
+        # 每次保存都按当前手机号重新生成，手机号改过后掩码不会过时
+        phone = acc.get("手机号", "")
+        if phone:
+            acc[PHONE_MASK_KEY] = _mask_phone(phone)
+    _atomic_write_bytes(spider.accounts_file, _json_dumps_bytes(accounts, indent=True))
+    _index_accounts(spider, accounts)
+
+NO_TOKEN_HEADERS = {"token": None}  # 覆盖会话默认请求头，去掉 token
+PHONE_LEN = 11  # 手机号位数
+SMS_CODE_LEN = 6  # 短信验证码位数
+MIN_TOKEN_LEN = 20  # 手动输入 Token 的最短长度
+TOKEN_CHECK_THREADS = 8  # 并发验证已保存账号 Token 的线程数
+TOKEN_VALID_CACHE_TTL = 120  # Token 验证结果缓存有效期（秒），期间重复验证不再请求
 
 def send_sms_code(spider, phone):
     url = f"{spider.base_url}/api.php/index/pcode"
-    headers = spider.headers.copy()
-    headers.pop("token", None)
     
     try:
-        r = requests.post(url, headers=headers, json={"scene": "login", "phone": phone}, timeout=10)
+        # 复用爬虫的长连接会话；登录前的请求不带 token（值为 None 的请求头会被 requests 去掉）
+        r = spider.session.post(url, headers=NO_TOKEN_HEADERS, json={"scene": "login", "phone": phone}, timeout=10)
         if r.status_code == 200:
-            data = r.json()
+            data = _json_loads(r.content)
             if data.get("code") == 1:
                 print("✅ 验证码发送成功")
                 return True
@@ -3082,13 +3947,10 @@ def login_with_account(spider, phone="", password="", pcode="", login_type=1):
     else:
         data["pcode"] = pcode
     
-    headers = spider.headers.copy()
-    headers.pop("token", None)
-    
     try:
-        r = requests.post(url, headers=headers, json=data, timeout=10)
+        r = spider.session.post(url, headers=NO_TOKEN_HEADERS, json=data, timeout=10)
         if r.status_code == 200:
-            res = r.json()
+            res = _json_loads(r.content)
             if res.get("code") == 1:
                 token = res["data"].get("token")
                 if token:
@@ -3115,23 +3977,47 @@ def login_menu(spider, auto_login=True):
             spider.set_token(auto_token)
             
             # 测试token是否有效
-            if test_token_valid(spider, auto_token):
+            valid = test_token_valid(spider, auto_token)
+            if valid:
                 print(f"✅ 自动登录成功！")
                 return auto_token
+            elif valid is None:
+                # 网络问题无法验证时不丢弃已保存的登录状态
+                print("⚠️ 暂时无法验证Token，保留登录状态，继续使用已保存的Token")
+                return auto_token
             else:
                 print("❌ 自动登录失败，Token已失效")
                 spider.clear_login_state()
+                
+                # 找出最近登录过、Token 仍有效的已保存账号，经用户确认后再切换
+                accounts = load_accounts(spider)
+                candidates = [acc for acc in accounts if acc.get("Token") and acc["Token"] != auto_token]
+                acc = first_valid_account(spider, candidates)
+                if acc is not None:
+                    name = acc.get('昵称', '未命名')
+                    switch = input(f"记住的账号已失效，是否切换到 {name}？(y/n): ").strip().lower() == 'y'
+                else:
+                    switch = False
+                if switch:
+                    token = acc["Token"]
+                    print(f"✅ 已切换到已保存账号: {name}")
+                    spider.set_token(token)
+                    acc["最后登录"] = _now_str()
+                    save_accounts(spider, accounts)
+                    return token
     
     accounts = load_accounts(spider)
     
     if accounts:
         print("📱 已保存账号（按最近登录排序）：")
-        for i, acc in enumerate(accounts, 1):
+        # 所有账号的 Token 并发验证，总耗时约等于一次请求
+        valid_flags = validate_tokens(spider, [acc.get("Token", "") for acc in accounts])
+        for i, (acc, valid) in enumerate(zip(accounts, valid_flags), 1):
             name = acc.get("昵称", "未命名")
-            phone = acc.get("手机号", "")
-            phone_display = phone[:3] + "****" + phone[-4:] if phone else "Token 用户"
+            phone_display = masked_phone(acc) or "Token 用户"
             last_login = acc.get("最后登录", "")
-            print(f"  {i}. {name} ({phone_display}) - {last_login}")
+            status = "✅" if valid else ("⚠️ 无法验证" if valid is None else "❌ 已失效")
+            print(f"  {i}. {name} ({phone_display}) - {last_login} {status}")
         
         choice = input("\n选择序号直接登录，或回车手动登录：").strip()
         if choice.isdigit():
@@ -3139,7 +4025,7 @@ def login_menu(spider, auto_login=True):
             if 0 <= idx < len(accounts):
                 token = accounts[idx]["Token"]
                 spider.set_token(token)
-                accounts[idx]["最后登录"] = time.strftime("%Y-%m-%d %H:%M:%S")
+                accounts[idx]["最后登录"] = _now_str()
                 save_accounts(spider, accounts)
                 return token
     
@@ -3158,13 +4044,13 @@ def login_menu(spider, auto_login=True):
             
         elif ch == "2":
             phone = input("手机号：").strip()
-            if not phone or len(phone) != 11:
+            if not phone or len(phone) != PHONE_LEN:
                 print("❌ 手机号格式错误")
                 continue
             
             if send_sms_code(spider, phone):
                 code = input("验证码：").strip()
-                if len(code) != 6:
+                if len(code) != SMS_CODE_LEN:
                     print("❌ 验证码格式错误")
                     continue
                 
@@ -3175,7 +4061,7 @@ def login_menu(spider, auto_login=True):
                 
         elif ch == "3":
             token = input("Token：").strip()
-            if len(token) < 20:
+            if len(token) < MIN_TOKEN_LEN:
                 print("❌ Token 过短")
                 continue
             print(f"✅ 直接使用Token: {token[:20]}...")
@@ -3192,14 +4078,15 @@ def login_menu(spider, auto_login=True):
             if input("保存账号？(y/n)：").lower() == "y":
                 nickname = input("昵称(可选)：").strip()
                 phone = input("手机号(可选)：").strip()
+                now_str = _now_str()
                 accounts.append({
                     "手机号": phone or "token_user",
                     "Token": token,
                     "昵称": nickname or phone or "未命名",
                     "登录方式": login_method,
-                    "最后登录": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "创建时间": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "更新时间": time.strftime("%Y-%m-%d %H:%M:%S")
+                    "最后登录": now_str,
+                    "创建时间": now_str,
+                    "更新时间": now_str
                 })
                 save_accounts(spider, accounts)
             spider.set_token(token)
@@ -3209,25 +4096,87 @@ def login_menu(spider, auto_login=True):
 
 
 def test_token_valid(spider, token):
-    """测试Token是否有效"""
+    """
+    测试Token是否有效
+    返回 True（有效）/ False（服务端判定无效）/ None（网络异常、限流或服务端错误，无法判断）
+    明确的有效/无效结果缓存 TOKEN_VALID_CACHE_TTL 秒，期间重复验证直接返回；
+    验证有效的 Token 另以 sha256 记入磁盘缓存，TOKEN_DISK_CACHE_TTL 秒内重新启动也不再验证
+    """
+    now = time.monotonic()
+    token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    with spider._token_valid_cache_lock:
+        cached = spider._token_valid_cache.get(token)
+        if cached is None:
+            valid_at = spider._recent_valid_tokens.get(token_hash)
+            if valid_at is not None and time.time() - valid_at < TOKEN_DISK_CACHE_TTL:
+                spider._token_valid_cache[token] = (now + TOKEN_VALID_CACHE_TTL, True)
+                return True
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    
+    valid = _check_token_valid(spider, token)
+    if valid is not None:
+        snapshot = None
+        with spider._token_valid_cache_lock:
+            spider._token_valid_cache[token] = (now + TOKEN_VALID_CACHE_TTL, valid)
+            if valid:
+                spider._recent_valid_tokens[token_hash] = time.time()
+                snapshot = spider._snapshot_token_cache()
+            elif spider._recent_valid_tokens.pop(token_hash, None) is not None:
+                snapshot = spider._snapshot_token_cache()
+        # 文件写入（含 fsync）在锁外进行，不阻塞其他线程查缓存
+        if snapshot is not None:
+            spider._save_token_cache(*snapshot)
+    return valid
+
+def _check_token_valid(spider, token):
+    """请求接口验证 Token，返回值同 test_token_valid（不经过缓存）"""
     try:
-        test_headers = spider.headers.copy()
-        test_headers["token"] = token
-        
-        # 简单的API测试请求
-        r = requests.post(
+        # 简单的API测试请求：复用爬虫的长连接会话，其余请求头沿用会话默认值，只覆盖 token；
+        # 网络异常、429、5xx 自动退避重试
+        r = spider._post_with_retry(
             f"{spider.base_url}/api.php/circle/list",
-            headers=test_headers,
+            headers={"token": token},
             json={"page": 1, "kw": "", "type": "user"},
             timeout=10
         )
-        
-        if r.status_code == 200:
-            data = r.json()
-            return data.get("code") == 1
-    except:
-        pass
-    return False
+    except requests.RequestException as e:
+        print(f"⚠️ Token验证网络异常: {e}")
+        return None
+    
+    if r.status_code == 429 or r.status_code >= 500:
+        return None
+    if r.status_code != 200:
+        return False
+    try:
+        data = _json_loads(r.content)
+    except ValueError:
+        return None
+    return isinstance(data, dict) and data.get("code") == 1
+
+def validate_tokens(spider, tokens, threads=TOKEN_CHECK_THREADS):
+    """并发验证多个 Token，返回与 tokens 顺序一致的验证结果列表"""
+    tokens = list(tokens)
+    if len(tokens) <= 1:
+        return [test_token_valid(spider, t) for t in tokens]
+    with ThreadPoolExecutor(max_workers=min(threads, len(tokens))) as executor:
+        return list(executor.map(lambda t: test_token_valid(spider, t), tokens))
+
+def first_valid_account(spider, accounts, threads=TOKEN_CHECK_THREADS):
+    """
+    按给定顺序（调用方已按最近登录排序）返回第一个 Token 有效的账号，都无效时返回 None
+    所有账号并发验证；排在前面的账号确认有效后取消其余尚未开始的验证
+    """
+    if not accounts:
+        return None
+    with ThreadPoolExecutor(max_workers=min(threads, len(accounts))) as executor:
+        futures = [executor.submit(test_token_valid, spider, acc["Token"]) for acc in accounts]
+        for acc, future in zip(accounts, futures):
+            if future.result():
+                for other in futures:
+                    other.cancel()
+                return acc
+    return None
 
 def manage_accounts(spider):
     accounts = load_accounts(spider)
@@ -3240,33 +4189,60 @@ def manage_accounts(spider):
         print(f"  {i}. {acc.get('昵称')} ({acc.get('手机号', 'Token')}) - {acc.get('最后登录')}")
     
     if input("\n删除账号？(y/n)：").lower() == "y":
-        idx = int(input("输入编号(0取消)：") or 0) - 1
+        idx = _ask_int("输入编号(0取消)：", 0) - 1
         if 0 <= idx < len(accounts):
             accounts.pop(idx)
             save_accounts(spider, accounts)
             print("✅ 已删除")
 
 def check_token_status(spider, token):
-    accounts = load_accounts(spider)
-    if accounts and token:
-        for acc in accounts:
-            if acc.get("Token") == token:
-                print(f"📊 当前账号: {acc.get('昵称')}")
-                phone = acc.get("手机号", "")
-                if phone:
-                    phone_display = phone[:3] + "****" + phone[-4:]
-                    print(f"   手机号: {phone_display}")
-                print(f"   账号创建: {acc.get('创建时间')}")
-                print(f"   最后登录: {acc.get('最后登录')}")
-                print(f"   Token预览: {token[:20]}...")
-                return
+    # 账号索引在加载/保存账号时已建立，无需每次重新读取文件逐个比对
+    if spider._account_by_token is None:
+        load_accounts(spider)
+    if spider._account_by_token and token:
+        acc = spider._account_by_token.get(token)
+        if acc is None:
+            print("📊 当前Token未在保存的账号中找到")
+            return
         
-        print("📊 当前Token未在保存的账号中找到")
+        lines = [f"📊 当前账号: {acc.get('昵称')}"]
+        phone_display = masked_phone(acc)
+        if phone_display:
+            lines.append(f"   手机号: {phone_display}")
+        lines.append(f"   账号创建: {acc.get('创建时间')}")
+        lines.append(f"   最后登录: {acc.get('最后登录')}")
+        lines.append(f"   Token预览: {token[:20]}...")
+        print("\n".join(lines))
     else:
         print("📊 未登录或未保存任何账号")
 
 
 # ---------- 主菜单 ----------
+MAIN_MENU_TEMPLATE = "\n".join((
+    "\n" + "=" * 60,
+    "📱 主菜单",
+    "=" * 60,
+    "当前账号: {token_preview}...",
+    "数据目录: {data_dir}",
+    "【爬虫】1.批量爬多页  2.爬特定帖  3.爬用户全部  4.手动浏览  5.用户文件",
+    "【搜索】6.搜索帖子  7.用户名搜索",
+    "【投票】8.单任务投票 9.批量投票  10.投票文件",
+    "【关注】11.查询关注列表",
+    "【账号】12.切换账号 13.管理账号 14.Token状态 15.清除登录状态 16.退出",
+    "=" * 60,
+))
+
+def _ask_int(prompt, default):
+    """读取整数输入：直接回车取默认值，输入非数字时提示并重新输入"""
+    while True:
+        text = input(prompt).strip()
+        if not text:
+            return default
+        try:
+            return int(text)
+        except ValueError:
+            print("❌ 请输入数字")
+
 def main():
     print("=" * 60)
     print("📱 BDSM 论坛工具")
@@ -3276,81 +4252,70 @@ def main():
     if not token:
         print("❌ 登录失败，程序退出")
         return
+    # 用户选择菜单时后台预热连接，第一次实际请求不必再等握手
+    spider.warm_up_connection()
+    
+    def crawl_pages():
+        start = _ask_int("开始页码(默认1)：", 1)
+        pages = _ask_int("爬取页数(默认3)：", 3)
+        spider.crawl_and_save_posts(start_page=start, max_pages=pages)
+    
+    def crawl_post():
+        pid = _ask_int("帖子ID：", 0)
+        if pid:
+            spider.crawl_specific_post(pid)
+    
+    def crawl_user():
+        uid = _ask_int("用户ID：", 0)
+        if uid:
+            spider.crawl_user_posts(uid)
+    
+    def single_vote():
+        tid = _ask_int("投票任务ID：", 0)
+        if tid:
+            spider.vote_single_test(tid)
+    
+    def switch_account():
+        nonlocal token
+        new_token = login_menu(spider, auto_login=False)
+        if new_token:
+            token = new_token
+    
+    def clear_login():
+        spider.clear_login_state()
+        print("🗑️  登录状态已清除，下次启动需要重新登录")
+    
+    # 菜单选项 -> 处理函数（16 退出单独处理）
+    actions = {
+        "1": crawl_pages,
+        "2": crawl_post,
+        "3": crawl_user,
+        "4": spider.manual_browse_posts,
+        "5": spider.show_user_files,
+        "6": spider.search_and_save_posts,
+        "7": spider.search_username,
+        "8": single_vote,
+        "9": spider.batch_vote,
+        "10": spider.show_vote_files,
+        "11": spider.query_attention_list,
+        "12": switch_account,
+        "13": lambda: manage_accounts(spider),
+        "14": lambda: check_token_status(spider, token),
+        "15": clear_login,
+    }
     
     while True:
-        print("\n" + "=" * 60)
-        print("📱 主菜单")
-        print("=" * 60)
-        print(f"当前账号: {token[:20]}...")
-        print(f"数据目录: {spider.data_dir}")
-        print("【爬虫】1.批量爬多页  2.爬特定帖  3.爬用户全部  4.手动浏览  5.用户文件")
-        print("【搜索】6.搜索帖子  7.用户名搜索")
-        print("【投票】8.单任务投票 9.批量投票  10.投票文件")
-        print("【关注】11.查询关注列表")
-        print("【账号】12.切换账号 13.管理账号 14.Token状态 15.清除登录状态 16.退出")
-        print("=" * 60)
+        print(MAIN_MENU_TEMPLATE.format(token_preview=token[:20], data_dir=spider.data_dir), flush=True)
         choice = input("请选择(1-16)：").strip()
         
-        if choice == "1":
-            start = int(input("开始页码(默认1)：") or 1)
-            pages = int(input("爬取页数(默认3)：") or 3)
-            spider.crawl_and_save_posts(start_page=start, max_pages=pages)
-            
-        elif choice == "2":
-            pid = int(input("帖子ID：") or 0)
-            if pid:
-                spider.crawl_specific_post(pid)
-                
-        elif choice == "3":
-            uid = int(input("用户ID：") or 0)
-            if uid:
-                spider.crawl_user_posts(uid)
-                
-        elif choice == "4":
-            spider.manual_browse_posts()
-            
-        elif choice == "5":
-            spider.show_user_files()
-            
-        elif choice == "6":
-            spider.search_and_save_posts()
-            
-        elif choice == "7":
-            spider.search_username()
-            
-        elif choice == "8":
-            tid = int(input("投票任务ID：") or 0)
-            if tid:
-                spider.vote_single_test(tid)
-                
-        elif choice == "9":
-            spider.batch_vote()
-            
-        elif choice == "10":
-            spider.show_vote_files()
-            
-        elif choice == "11":
-            spider.query_attention_list()
-            
-        elif choice == "12":
-            new_token = login_menu(spider, auto_login=False)
-            if new_token:
-                token = new_token
-                
-        elif choice == "13":
-            manage_accounts(spider)
-            
-        elif choice == "14":
-            check_token_status(spider, token)
-            
-        elif choice == "15":
-            spider.clear_login_state()
-            print("🗑️  登录状态已清除，下次启动需要重新登录")
-            
-        elif choice == "16":
+        if choice == "16":
             print(f"👋 再见！数据保存在 {spider.data_dir}/")
+            spider.close()
             break
-            
+        
+        handler = actions.get(choice)
+        if handler:
+            handler()
         else:
             print("❌ 无效选择")
 
@@ -15,7 +15,7 @@ source.include_exts = py,png,jpg,kv,atlas,json,txt,ttf
 version = 2.0.0
 
 # 依赖 (Kivy 是必须的，其他按需添加)
-requirements = python3,kivy,requests,urllib3,certifi,charset-normalizer,idna
+requirements = python3,kivy,requests,urllib3,certifi,charset-normalizer,idna,sqlite3
 
 # Android 配置
 # 权限声明 - 覆盖所有Android版本的存储权限
@@ -470,7 +470,7 @@ class LoginScreen(BoxLayout):
             return
 
         try:
-            from app.your_code import load_accounts
+            from app.your_code import load_accounts, masked_phone
             accounts = load_accounts(self.app.spider)
 
             if accounts:
@@ -489,8 +489,7 @@ class LoginScreen(BoxLayout):
 
                 for i, acc in enumerate(accounts[:4]):
                     name = acc.get("昵称", "未命名")
-                    phone = acc.get("手机号", "")
-                    phone_display = phone[:3] + "****" + phone[-4:] if len(phone) >= 7 else "Token"
+                    phone_display = masked_phone(acc) or "Token"
 
                     btn = StyledButton(
                         text=f'{name} ({phone_display})',
@@ -591,11 +590,15 @@ class LoginScreen(BoxLayout):
                     self.enable_login_btn()
                     return
 
-            if token and test_token_valid(self.app.spider, token):
+            valid = test_token_valid(self.app.spider, token) if token else False
+            if valid:
                 self.app.spider.set_token(token)
                 self.app.token = token
                 self.update_status('登录成功')
                 Clock.schedule_once(lambda dt: self.app.show_main_screen(), 0.3)
+            elif valid is None:
+                self.update_status('网络异常，无法验证 Token，请稍后重试')
+                self.enable_login_btn()
             else:
                 self.update_status('登录失败')
                 self.enable_login_btn()
@@ -614,7 +617,8 @@ class LoginScreen(BoxLayout):
             from app.your_code import test_token_valid, load_accounts, save_accounts
             import time
 
-            if test_token_valid(self.app.spider, token):
+            valid = test_token_valid(self.app.spider, token)
+            if valid:
                 self.app.spider.set_token(token)
                 self.app.token = token
                 accounts = load_accounts(self.app.spider)
@@ -625,6 +629,8 @@ class LoginScreen(BoxLayout):
                 save_accounts(self.app.spider, accounts)
                 self.update_status('登录成功')
                 Clock.schedule_once(lambda dt: self.app.show_main_screen(), 0.3)
+            elif valid is None:
+                self.update_status('网络异常，请稍后重试')
             else:
                 self.update_status('Token 已失效')
         except Exception as e:
@@ -1024,6 +1030,7 @@ class MainScreen(BoxLayout):
             fields=[
                 {"key": "user_id", "label": "用户ID", "default": ""},
                 {"key": "page", "label": "页码", "default": "1"},
+                {"key": "pages", "label": "页数", "default": "1"},
             ],
             callback=self._do_query_attention
         )
@@ -1032,8 +1039,9 @@ class MainScreen(BoxLayout):
     def _do_query_attention(self, values):
         user_id = values.get("user_id", "").strip()
         page = int(values.get("page", 1) or 1)
+        pages = int(values.get("pages", 1) or 1)
         if user_id and user_id.isdigit():
-            self.run_task(lambda: self.app.spider.query_attention_gui(int(user_id), page))
+            self.run_task(lambda: self.app.spider.query_attention_gui(int(user_id), page, pages))
 
     # ========== 账号功能 ==========
     def on_switch_account(self, instance):
@@ -1042,27 +1050,27 @@ class MainScreen(BoxLayout):
     def on_manage_accounts(self, instance):
         """管理账号 - 显示已保存账号列表"""
         def _manage():
-            from app.your_code import load_accounts
+            from app.your_code import load_accounts, validate_tokens, masked_phone
             accounts = load_accounts(self.app.spider)
             if not accounts:
                 print('无保存账号')
                 return
 
+            # 所有账号的 Token 并发验证
+            valid_flags = validate_tokens(self.app.spider, [acc.get('Token', '') for acc in accounts])
+
             print('=' * 50)
             print('已保存账号:')
             print('=' * 50)
-            for i, acc in enumerate(accounts, 1):
+            for i, (acc, valid) in enumerate(zip(accounts, valid_flags), 1):
                 name = acc.get('昵称', '未命名')
-                phone = acc.get('手机号', '')
-                if phone and len(phone) >= 7:
-                    phone_display = phone[:3] + '****' + phone[-4:]
-                else:
-                    phone_display = 'Token用户'
+                phone_display = masked_phone(acc) or 'Token用户'
                 last_login = acc.get('最后登录', '未知')
                 login_method = acc.get('登录方式', '未知')
                 print(f"{i}. {name} ({phone_display})")
                 print(f"   登录方式: {login_method}")
                 print(f"   最后登录: {last_login}")
+                print(f"   Token状态: {'有效' if valid else ('无法验证' if valid is None else '已失效')}")
             print('=' * 50)
             print(f'共 {len(accounts)} 个账号')
 
@@ -1071,7 +1079,7 @@ class MainScreen(BoxLayout):
     def on_token_status(self, instance):
         """查看当前Token状态"""
         def _check_status():
-            from app.your_code import load_accounts, test_token_valid
+            from app.your_code import load_accounts, test_token_valid, masked_phone
             token = self.app.token
 
             print('=' * 50)
@@ -1089,6 +1097,8 @@ class MainScreen(BoxLayout):
             is_valid = test_token_valid(self.app.spider, token)
             if is_valid:
                 print('Token状态: 有效')
+            elif is_valid is None:
+                print('Token状态: 无法验证（网络异常）')
             else:
                 print('Token状态: 已失效')
 
@@ -1100,9 +1110,9 @@ class MainScreen(BoxLayout):
                     if acc.get('Token') == token:
                         found = True
                         print(f"账号昵称: {acc.get('昵称', '未命名')}")
-                        phone = acc.get('手机号', '')
-                        if phone and len(phone) >= 7:
-                            print(f"手机号: {phone[:3]}****{phone[-4:]}")
+                        phone_display = masked_phone(acc)
+                        if phone_display:
+                            print(f"手机号: {phone_display}")
                         print(f"登录方式: {acc.get('登录方式', '未知')}")
                         print(f"账号创建: {acc.get('创建时间', '未知')}")
                         print(f"最后登录: {acc.get('最后登录', '未知')}")
@@ -1235,6 +1245,14 @@ class BDSMApp(App):
 
         return self.root_widget
 
+    def on_stop(self):
+        """应用退出时释放爬虫资源（后台写入、文件、数据库、连接）"""
+        if self.spider:
+            try:
+                self.spider.close()
+            except Exception as e:
+                print(f"关闭资源失败: {e}")
+
     def init_app(self, dt):
         """延迟初始化"""
         try:
@@ -1352,7 +1370,9 @@ class BDSMApp(App):
     def _try_auto_login(self, token):
         try:
             from app.your_code import test_token_valid
-            if test_token_valid(self.spider, token):
+            valid = test_token_valid(self.spider, token)
+            if valid or valid is None:
+                # 网络问题无法验证时先沿用已保存的 Token，不强制重新登录
                 self.spider.set_token(token)
                 self.token = token
                 Clock.schedule_once(lambda dt: self.show_main_screen(), 0)